@@ -0,0 +1,173 @@
+from typing import Iterable, List, Tuple
+from datetime import date
+
+import Solution
+from Utility.AsyncDBConnector import AsyncDBConnector
+from Utility.ReturnValue import ReturnValue
+
+from Business.Owner import Owner
+from Business.Customer import Customer
+from Business.Apartment import Apartment
+
+# asyncio counterparts of the Solution.py API, with the same arguments and return values.
+# each call runs the Solution.py function on the database executor (see AsyncDBConnector),
+# so the event loop keeps serving other requests while it waits for the database:
+#     results = await asyncio.gather(*[AsyncSolution.get_apartment(i) for i in ids])
+
+
+# ---------------------------------- CRUD API: ----------------------------------
+
+async def create_tables():
+    await AsyncDBConnector.run(Solution.create_tables)
+
+
+async def clear_tables():
+    await AsyncDBConnector.run(Solution.clear_tables)
+
+
+async def drop_tables():
+    await AsyncDBConnector.run(Solution.drop_tables)
+
+
+async def add_owner(owner: Owner) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.add_owner, owner)
+
+
+async def get_owner(owner_id: int) -> Owner:
+    return await AsyncDBConnector.run(Solution.get_owner, owner_id)
+
+
+async def delete_owner(owner_id: int) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.delete_owner, owner_id)
+
+
+async def add_apartment(apartment: Apartment) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.add_apartment, apartment)
+
+
+async def get_apartment(apartment_id: int) -> Apartment:
+    return await AsyncDBConnector.run(Solution.get_apartment, apartment_id)
+
+
+async def delete_apartment(apartment_id: int) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.delete_apartment, apartment_id)
+
+
+async def add_customer(customer: Customer) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.add_customer, customer)
+
+
+async def get_customer(customer_id: int) -> Customer:
+    return await AsyncDBConnector.run(Solution.get_customer, customer_id)
+
+
+async def delete_customer(customer_id: int) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.delete_customer, customer_id)
+
+
+async def customer_made_reservation(customer_id: int, apartment_id: int, start_date: date, end_date: date,
+                                    total_price: float) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.customer_made_reservation, customer_id, apartment_id, start_date,
+                                      end_date, total_price)
+
+
+async def customer_cancelled_reservation(customer_id: int, apartment_id: int, start_date: date) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.customer_cancelled_reservation, customer_id, apartment_id, start_date)
+
+
+async def customer_reviewed_apartment(customer_id: int, apartment_id: int, review_date: date, rating: int,
+                                      review_text: str) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.customer_reviewed_apartment, customer_id, apartment_id, review_date,
+                                      rating, review_text)
+
+
+async def customer_updated_review(customer_id: int, apartment_id: int, update_date: date,
+                                  new_rating: int, new_text: str) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.customer_updated_review, customer_id, apartment_id, update_date,
+                                      new_rating, new_text)
+
+
+async def owner_owns_apartment(owner_id: int, apartment_id: int) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.owner_owns_apartment, owner_id, apartment_id)
+
+
+async def owner_drops_apartment(owner_id: int, apartment_id: int) -> ReturnValue:
+    return await AsyncDBConnector.run(Solution.owner_drops_apartment, owner_id, apartment_id)
+
+
+async def get_apartment_owner(apartment_id: int) -> Owner:
+    return await AsyncDBConnector.run(Solution.get_apartment_owner, apartment_id)
+
+
+async def get_owner_apartments(owner_id: int) -> List[Apartment]:
+    return await AsyncDBConnector.run(Solution.get_owner_apartments, owner_id)
+
+
+# ---------------------------------- BULK API: ----------------------------------
+
+async def add_owners(owners: List[Owner]) -> List[ReturnValue]:
+    return await AsyncDBConnector.run(Solution.add_owners, owners)
+
+
+async def add_apartments(apartments: List[Apartment]) -> List[ReturnValue]:
+    return await AsyncDBConnector.run(Solution.add_apartments, apartments)
+
+
+async def add_customers(customers: List[Customer]) -> List[ReturnValue]:
+    return await AsyncDBConnector.run(Solution.add_customers, customers)
+
+
+async def add_reservations(reservations: Iterable[Tuple[int, int, date, date, float]]) -> List[ReturnValue]:
+    return await AsyncDBConnector.run(Solution.add_reservations, reservations)
+
+
+async def get_owners(owner_ids: List[int]) -> List[Owner]:
+    return await AsyncDBConnector.run(Solution.get_owners, owner_ids)
+
+
+async def get_apartments(apartment_ids: List[int]) -> List[Apartment]:
+    return await AsyncDBConnector.run(Solution.get_apartments, apartment_ids)
+
+
+async def get_customers(customer_ids: List[int]) -> List[Customer]:
+    return await AsyncDBConnector.run(Solution.get_customers, customer_ids)
+
+
+# ---------------------------------- BASIC API: ----------------------------------
+
+async def get_apartment_rating(apartment_id: int) -> float:
+    return await AsyncDBConnector.run(Solution.get_apartment_rating, apartment_id)
+
+
+async def get_owner_rating(owner_id: int) -> float:
+    return await AsyncDBConnector.run(Solution.get_owner_rating, owner_id)
+
+
+async def get_top_customer() -> Customer:
+    return await AsyncDBConnector.run(Solution.get_top_customer)
+
+
+async def reservations_per_owner() -> List[Tuple[str, int]]:
+    return await AsyncDBConnector.run(Solution.reservations_per_owner)
+
+
+# ---------------------------------- ADVANCED API: ----------------------------------
+
+async def get_all_location_owners() -> List[Owner]:
+    return await AsyncDBConnector.run(Solution.get_all_location_owners)
+
+
+async def best_value_for_money() -> Apartment:
+    return await AsyncDBConnector.run(Solution.best_value_for_money)
+
+
+async def profit_per_month(year: int) -> List[Tuple[int, float]]:
+    return await AsyncDBConnector.run(Solution.profit_per_month, year)
+
+
+async def profit_per_month_range(start_year: int, end_year: int) -> List[Tuple[int, int, float]]:
+    return await AsyncDBConnector.run(Solution.profit_per_month_range, start_year, end_year)
+
+
+async def get_apartment_recommendation(customer_id: int) -> List[Tuple[Apartment, float]]:
+    return await AsyncDBConnector.run(Solution.get_apartment_recommendation, customer_id)
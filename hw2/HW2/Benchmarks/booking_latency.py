@@ -0,0 +1,89 @@
+# measures customer_made_reservation latency while Reserved grows.
+# run from the HW2 directory against a scratch database (the tables are created and dropped):
+#     python -m Benchmarks.booking_latency [size ...] [--no-index]
+# --no-index drops the Reserved_no_overlap exclusion constraint first, which shows the sequential scan
+# every booking paid before it (loading is quadratic then as well, keep the sizes small)
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import Solution
+import Utility.DBConnector as Connector
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+from Utility.ReturnValue import ReturnValue
+
+APARTMENTS = 1000
+CUSTOMERS = 1000
+BOOKINGS = 1000
+FIRST_DAY = date(2000, 1, 1)
+STAY = 3  # days between the start dates of consecutive loaded reservations of an apartment
+
+
+def populate():
+    for i in range(1, APARTMENTS + 1):
+        Solution.add_apartment(Apartment(i, "address " + str(i), "city", "country", 50))
+    for i in range(1, CUSTOMERS + 1):
+        Solution.add_customer(Customer(i, "customer " + str(i)))
+
+
+# the n-th reservation ever loaded, apartments take turns so they all grow at the same pace
+def reservation(n: int) -> tuple:
+    start_date = FIRST_DAY + timedelta(days=STAY * (n // APARTMENTS))
+    return n % CUSTOMERS + 1, n % APARTMENTS + 1, start_date, start_date + timedelta(days=STAY - 1), 100.0
+
+
+def grow(current: int, size: int, batch: int = 100000) -> None:
+    for first in range(current, size, batch):
+        report = Solution.add_reservations(reservation(n) for n in range(first, min(first + batch, size)))
+        assert all(status == ReturnValue.OK for status in report), "loading Reserved failed"
+
+
+# half of the bookings hit a taken stay (BAD_PARAMS), the other half are accepted and cancelled again
+def book(size: int, rng: random.Random) -> float:
+    elapsed = 0.0
+    for i in range(BOOKINGS):
+        n = rng.randrange(size)
+        customer_id, apartment_id, start_date, end_date, total_price = reservation(n)
+        if i % 2:
+            # the check-out day is free: a stay starting and ending on it touches but does not overlap the stay
+            start_date = end_date
+        before = time.perf_counter()
+        status = Solution.customer_made_reservation(customer_id, apartment_id, start_date, end_date, total_price)
+        elapsed += time.perf_counter() - before
+        if status == ReturnValue.OK:
+            Solution.customer_cancelled_reservation(customer_id, apartment_id, start_date)
+    return elapsed
+
+
+def main(sizes, index: bool = True):
+    Solution.create_tables()
+    try:
+        populate()
+        if not index:
+            conn = Connector.DBConnector()
+            try:
+                conn.execute("ALTER TABLE Reserved DROP CONSTRAINT Reserved_no_overlap")
+            finally:
+                conn.close()
+        rng = random.Random(0)
+        current = 0
+        print("%10s  %12s" % ("rows", "us/booking"))
+        for size in sorted(sizes):
+            grow(current, size)
+            current = size
+            conn = Connector.DBConnector()
+            try:
+                conn.execute("ANALYZE Reserved")
+            finally:
+                conn.close()
+            elapsed = book(size, rng)
+            print("%10d  %12.1f" % (size, elapsed / BOOKINGS * 1e6))
+    finally:
+        Solution.drop_tables()
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != "--no-index"]
+    main([int(arg) for arg in args] or [10000, 100000, 1000000], index="--no-index" not in sys.argv[1:])
@@ -0,0 +1,65 @@
+# measures customer_made_reservation throughput with 1, 2, 4, ... worker threads up to the connection pool size.
+# run from the HW2 directory against a scratch database (the tables are created and dropped):
+#     python -m Benchmarks.concurrency [--pool-size 8] [--bookings 2000] [--contended]
+# by default every worker books its own apartment, so throughput should grow about linearly with the workers
+# until the pool (or the server's cores) is saturated. --contended makes all workers book the same apartment
+# and the same nights, which shows the cost of the exclusion constraint settling the races
+import argparse
+import time
+from datetime import date, timedelta
+
+import Solution
+import Utility.DBConnector as Connector
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+from Utility.ReturnValue import ReturnValue
+from Utility.SolutionExecutor import SolutionExecutor
+
+FIRST_DAY = date(2000, 1, 1)
+
+
+def book(worker: int, bookings: int, contended: bool, round_: int) -> int:
+    apartment_id = 1 if contended else worker
+    booked = 0
+    for i in range(bookings):
+        start_date = FIRST_DAY + timedelta(days=2 * (round_ * bookings + i))
+        status = Solution.customer_made_reservation(worker, apartment_id, start_date, start_date + timedelta(days=1),
+                                                    100)
+        booked += status == ReturnValue.OK
+    return booked
+
+
+def main(pool_size: int, bookings: int, contended: bool):
+    Connector.DBConnector.configure_pool(min_size=pool_size, max_size=pool_size)
+    Solution.configure_cache(max_size=0)
+    Solution.create_tables()
+    try:
+        for i in range(1, pool_size + 1):
+            Solution.add_apartment(Apartment(i, "address " + str(i), "city", "country", 50))
+            Solution.add_customer(Customer(i, "customer " + str(i)))
+        print("%8s  %12s  %8s  %8s" % ("workers", "bookings/s", "speedup", "booked"))
+        levels = [2 ** i for i in range(pool_size.bit_length()) if 2 ** i < pool_size] + [pool_size]
+        base = None
+        for round_, workers in enumerate(levels):
+            with SolutionExecutor(max_workers=workers) as executor:
+                before = time.perf_counter()
+                booked = sum(executor.map(book, range(1, workers + 1), [bookings] * workers,
+                                          [contended] * workers, [round_] * workers))
+                elapsed = time.perf_counter() - before
+            throughput = workers * bookings / elapsed
+            base = base or throughput
+            print("%8d  %12.1f  %8.2f  %8d" % (workers, throughput, throughput / base, booked))
+        print("retries: %(retries)d, recovered: %(recovered)d, exhausted: %(exhausted)d" %
+              Connector.DBConnector.retry_policy().stats())
+    finally:
+        Solution.drop_tables()
+        Connector.DBConnector.close_pool()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="customer_made_reservation throughput per worker thread count")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--bookings", type=int, default=2000, help="bookings per worker and round")
+    parser.add_argument("--contended", action="store_true", help="all workers book the same apartment")
+    args = parser.parse_args()
+    main(args.pool_size, args.bookings, args.contended)
@@ -0,0 +1,60 @@
+# cost of getting connection parameters and of constructing a DBConnector, in microseconds per call.
+# "parse database.ini" is what reading the parameters cost before they were cached: a ConfigParser read of the
+# file (two when the working directory has none), "DBConnector.config()" is the cached lookup now.
+# DBConnector() + close() checks a pooled connection out and back in, it needs a server.
+# run from the HW2 directory:
+#     python -m Benchmarks.connector [--calls 100000] [--external]
+# without --external the server is a throwaway cluster (Benchmarks/local_postgres.py)
+import argparse
+import os
+import time
+from configparser import ConfigParser
+
+import Utility.DBConnector as Connector
+from Benchmarks.local_postgres import LocalPostgres
+
+
+# the parameters as DBConnector read them on every call before they were cached
+def parse_ini() -> dict:
+    for directory in [os.getcwd(), os.path.dirname(os.getcwd())]:
+        parser = ConfigParser()
+        parser.read(os.path.join(directory, "Utility", "database.ini"))
+        if parser.has_section("postgresql"):
+            return dict(parser.items("postgresql"))
+    return {}
+
+
+def construct():
+    Connector.DBConnector().close()
+
+
+def per_call(fn, calls: int) -> float:
+    for _ in range(min(calls, 1000)):
+        fn()
+    before = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - before) / calls * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DBConnector construction overhead")
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--external", action="store_true", help="use database.ini instead of a throwaway cluster")
+    args = parser.parse_args(argv)
+
+    print("%-32s %10.2f us" % ("parse database.ini", per_call(parse_ini, args.calls)))
+    print("%-32s %10.2f us" % ("DBConnector.config()", per_call(Connector.DBConnector.config, args.calls)))
+    if args.external:
+        print("%-32s %10.2f us" % ("DBConnector() + close()", per_call(construct, args.calls)))
+        return
+    with LocalPostgres() as params:
+        Connector.DBConnector.configure_pool(params=params)
+        try:
+            print("%-32s %10.2f us" % ("DBConnector() + close()", per_call(construct, args.calls)))
+        finally:
+            Connector.DBConnector.close_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# synthetic data for the benchmarks, loaded through the bulk API of Solution.py.
+# a scale is the number of reservations, the other tables are sized from it:
+#     customers   reservations / 4
+#     apartments  reservations / 20 (so about 20 stays each), owned by apartments / 5 owners
+#     reviews     every other reservation
+# the data is a function of (scale, seed), so runs at the same scale are comparable
+import random
+from datetime import date, timedelta
+
+import Solution
+import Utility.DBConnector as Connector
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+from Business.Owner import Owner
+from Utility.ReturnValue import ReturnValue
+
+SCALES = {"1k": 1000, "100k": 100000, "10M": 10000000}
+BATCH = 100000
+FIRST_DAY = date(2015, 1, 1)
+SLOT = 5  # days between the start dates of consecutive stays of an apartment
+CITIES = [("Haifa", "Israel"), ("Tel Aviv", "Israel"), ("Paris", "France"), ("Lyon", "France"),
+          ("Berlin", "Germany"), ("Rome", "Italy"), ("Madrid", "Spain"), ("Lisbon", "Portugal")]
+
+
+class Dataset:
+    def __init__(self, reservations: int, seed: int = 0):
+        self.reservations = reservations
+        self.seed = seed
+        self.customers = max(reservations // 4, 1)
+        self.apartments = max(reservations // 20, 1)
+        self.owners = max(self.apartments // 5, 1)
+
+    # the n-th reservation: apartments take turns, so stays of an apartment never overlap,
+    # and an apartment never sees the same customer twice, so every reservation can be reviewed
+    def reservation(self, n: int, rng: random.Random) -> tuple:
+        apartment = n % self.apartments
+        stay = n // self.apartments
+        start_date = FIRST_DAY + timedelta(days=SLOT * stay)
+        nights = rng.randint(1, SLOT - 1)
+        customer_id = (apartment + stay) % self.customers + 1
+        end_date = start_date + timedelta(days=nights)
+        return customer_id, apartment + 1, start_date, end_date, nights * rng.randint(50, 300)
+
+    def load(self):
+        rng = random.Random(self.seed)
+        for first in range(1, self.owners + 1, BATCH):
+            self.__check(Solution.add_owners([Owner(i, "owner %d" % i)
+                                              for i in range(first, min(first + BATCH, self.owners + 1))]))
+        for first in range(1, self.customers + 1, BATCH):
+            self.__check(Solution.add_customers([Customer(i, "customer %d" % i)
+                                                 for i in range(first, min(first + BATCH, self.customers + 1))]))
+        for first in range(1, self.apartments + 1, BATCH):
+            apartments = []
+            for i in range(first, min(first + BATCH, self.apartments + 1)):
+                city, country = CITIES[i % len(CITIES)]
+                apartments.append(Apartment(i, "%d main street" % i, city, country, rng.randint(20, 200)))
+            self.__check(Solution.add_apartments(apartments))
+        self.__copy("Owns", ["Owner_ID", "ID"], ((i % self.owners + 1, i) for i in range(1, self.apartments + 1)))
+
+        for first in range(0, self.reservations, BATCH):
+            batch = [self.reservation(n, rng) for n in range(first, min(first + BATCH, self.reservations))]
+            self.__check(Solution.add_reservations(batch))
+            # reviews go through COPY, there is no bulk review API
+            self.__copy("Reviewed", ["ID", "Customer_ID", "review_date", "rating", "review_text"],
+                        ((apartment_id, customer_id, end_date + timedelta(days=1), rng.randint(1, 10), "review")
+                         for customer_id, apartment_id, _, end_date, _ in batch[::2]))
+
+        conn = Connector.DBConnector()
+        try:
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def __copy(table: str, columns: list, rows):
+        conn = Connector.DBConnector()
+        try:
+            with conn.transaction():
+                conn.copy_from(table, columns, rows)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def __check(report):
+        failed = [status for status in report if status != ReturnValue.OK]
+        if failed:
+            raise RuntimeError("loading failed: %d rows rejected, first %s" % (len(failed), failed[0]))
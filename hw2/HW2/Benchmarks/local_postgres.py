@@ -0,0 +1,83 @@
+# a throwaway PostgreSQL cluster for the benchmarks: initdb into a temporary directory, start it on a free port
+# listening only on a unix socket in that directory, and remove everything when done.
+# the server binaries are looked up in $PG_BIN, then `pg_config --bindir`, then PATH.
+# the contrib modules must be installed (Solution.py needs btree_gist)
+#     with LocalPostgres() as params:
+#         Connector.DBConnector.configure_pool(params=params)
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+
+import psycopg2
+
+DATABASE = "benchmark"
+
+
+def _binary(name: str) -> str:
+    directories = []
+    if os.environ.get("PG_BIN"):
+        directories.append(os.environ["PG_BIN"])
+    try:
+        directories.append(subprocess.run(["pg_config", "--bindir"], check=True, capture_output=True,
+                                          text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    for directory in directories:
+        path = os.path.join(directory, name)
+        if os.access(path, os.X_OK):
+            return path
+    path = shutil.which(name)
+    if path is None:
+        raise RuntimeError(name + " not found, set PG_BIN to the PostgreSQL bin directory")
+    return path
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalPostgres:
+    # settings - extra server settings, e.g. {"shared_buffers": "1GB"}.
+    # durability is off by default, a crash only loses the throwaway data
+    def __init__(self, settings: dict = None):
+        self.settings = {"fsync": "off", "synchronous_commit": "off", "full_page_writes": "off",
+                         "listen_addresses": "''"}
+        self.settings.update(settings or {})
+        self.directory = None
+        self.params = None
+
+    def __enter__(self) -> dict:
+        self.directory = tempfile.mkdtemp(prefix="hw2_benchmark_")
+        data = os.path.join(self.directory, "data")
+        port = _free_port()
+        try:
+            subprocess.run([_binary("initdb"), "-D", data, "-U", "postgres", "-A", "trust", "--no-sync"],
+                           check=True, capture_output=True)
+            options = "-p %d -k %s %s" % (port, self.directory,
+                                          " ".join("-c %s=%s" % item for item in self.settings.items()))
+            subprocess.run([_binary("pg_ctl"), "-D", data, "-o", options, "-l", os.path.join(self.directory, "log"),
+                            "-w", "start"], check=True, capture_output=True)
+            self.params = {"host": self.directory, "port": port, "user": "postgres", "dbname": "postgres"}
+            connection = psycopg2.connect(**self.params)
+            try:
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute("CREATE DATABASE " + DATABASE)
+            finally:
+                connection.close()
+            self.params["dbname"] = DATABASE
+            return self.params
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        data = os.path.join(self.directory, "data")
+        if os.path.exists(os.path.join(data, "postmaster.pid")):
+            subprocess.run([_binary("pg_ctl"), "-D", data, "-m", "immediate", "-w", "stop"], capture_output=True)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return False
@@ -0,0 +1,72 @@
+# per apartment booking and review latency as the total volume grows, for each partitioning of Reserved and Reviewed
+# (see Solution.configure_partitioning). every scale loads the synthetic dataset of Benchmarks/datagen.py, whose
+# apartments always have about 20 stays each, so only the size of the tables changes between scales.
+# run from the HW2 directory:
+#     python -m Benchmarks.partitioning [--scales 10000 100000 1000000] [--schemes plain hash range]
+# prints the p50 latency of every scale and its growth from the smallest scale
+import argparse
+
+import Solution
+import Utility.DBConnector as Connector
+from Benchmarks.datagen import Dataset
+from Benchmarks.local_postgres import LocalPostgres
+from Benchmarks.suite import measure, operations
+
+MEASURED = ["customer_made_reservation+customer_cancelled_reservation", "customer_updated_review",
+            "get_apartment_rating"]
+
+
+def run(scheme: str, scales: list, seed: int) -> dict:
+    Solution.configure_partitioning(None if scheme == "plain" else scheme)
+    results = {}
+    for scale in scales:
+        dataset = Dataset(scale, seed)
+        Solution.create_tables()
+        try:
+            dataset.load()
+            for name, calls, call in operations(dataset):
+                if name in MEASURED:
+                    results[(name, scale)] = measure(dataset, name, calls, call, seed)["p50"]
+        finally:
+            Solution.drop_tables()
+    return results
+
+
+def report(scheme: str, scales: list, results: dict):
+    print("\n" + scheme)
+    print("%-58s" % "p50 ms" + "".join("%12d" % scale for scale in scales) + "%10s" % "growth")
+    for name in MEASURED:
+        latencies = [results[(name, scale)] for scale in scales]
+        print("%-58s" % name + "".join("%12.3f" % (latency * 1e3) for latency in latencies) +
+              "%9.2fx" % (latencies[-1] / latencies[0]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="booking and review latency per partitioning scheme")
+    parser.add_argument("--scales", type=int, nargs="*", default=[10000, 100000, 1000000],
+                        help="reservations to load, the largest should be 100 times the smallest")
+    parser.add_argument("--schemes", nargs="*", default=["plain", "hash", "range"], choices=["plain", "hash", "range"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--external", action="store_true", help="use database.ini instead of a throwaway cluster")
+    args = parser.parse_args(argv)
+    scales = sorted(args.scales)
+
+    Solution.configure_cache(max_size=0)
+    try:
+        for scheme in args.schemes:
+            if args.external:
+                results = run(scheme, scales, args.seed)
+            else:
+                with LocalPostgres() as params:
+                    Connector.DBConnector.configure_pool(params=params)
+                    try:
+                        results = run(scheme, scales, args.seed)
+                    finally:
+                        Connector.DBConnector.close_pool()
+            report(scheme, scales, results)
+    finally:
+        Solution.configure_partitioning(None)
+
+
+if __name__ == '__main__':
+    main()
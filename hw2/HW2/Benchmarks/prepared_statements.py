@@ -0,0 +1,56 @@
+# compares the literal-rendering query path with the prepared statement path.
+# run from the HW2 directory against a scratch database (the tables are created and dropped):
+#     python -m Benchmarks.prepared_statements [calls]
+import sys
+import time
+
+from psycopg2 import sql
+
+import Solution
+import Utility.DBConnector as Connector
+from Business.Owner import Owner
+
+OWNERS = 100
+
+
+def literal_path(conn: Connector.DBConnector, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        query = sql.SQL("SELECT * FROM Owner WHERE Owner_ID = {id}").format(id=sql.Literal(i % OWNERS + 1))
+        conn.execute(query)
+    return time.perf_counter() - start
+
+
+def prepared_path(conn: Connector.DBConnector, calls: int) -> float:
+    statement = Solution.PREPARED_STATEMENTS["get_owner"]
+    start = time.perf_counter()
+    for i in range(calls):
+        conn.execute_prepared(statement, (i % OWNERS + 1,))
+    return time.perf_counter() - start
+
+
+def main(calls: int = 10000):
+    Solution.create_tables()
+    conn = None
+    try:
+        for i in range(1, OWNERS + 1):
+            Solution.add_owner(Owner(i, "owner " + str(i)))
+        conn = Connector.DBConnector()
+        # warm up both paths (prepares the statement on this connection)
+        literal_path(conn, 100)
+        prepared_path(conn, 100)
+
+        literal = literal_path(conn, calls)
+        prepared = prepared_path(conn, calls)
+        print("calls: %d" % calls)
+        print("literal:  %8.3f s  %8.1f us/call" % (literal, literal / calls * 1e6))
+        print("prepared: %8.3f s  %8.1f us/call" % (prepared, prepared / calls * 1e6))
+        print("speedup:  %8.2fx" % (literal / prepared))
+    finally:
+        if conn is not None:
+            conn.close()
+        Solution.drop_tables()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
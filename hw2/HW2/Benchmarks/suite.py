@@ -0,0 +1,202 @@
+# benchmark suite of the Solution.py API: loads a synthetic dataset (Benchmarks/datagen.py) into a throwaway
+# PostgreSQL cluster (Benchmarks/local_postgres.py), times every CRUD and analytics function and compares the
+# results to a JSON baseline. run from the HW2 directory:
+#     python -m Benchmarks.suite --scale 100k --record baseline.json
+#     python -m Benchmarks.suite --scale 100k --baseline baseline.json
+# exits with status 1 when a function's p50 latency regressed by more than --threshold against the baseline.
+# --external uses the database of database.ini instead of a throwaway cluster (its tables are dropped!)
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from psycopg2 import sql
+
+import Solution
+import Utility.DBConnector as Connector
+from Benchmarks.datagen import Dataset, SCALES
+from Benchmarks.local_postgres import LocalPostgres
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+from Business.Owner import Owner
+
+
+# every benchmarked call: (name, number of calls, function of (dataset, rng, i) running one call).
+# writes undo themselves, so the dataset is the same for every function
+def operations(dataset: Dataset) -> list:
+    def random_apartment(rng):
+        return rng.randint(1, dataset.apartments)
+
+    def random_customer(rng):
+        return rng.randint(1, dataset.customers)
+
+    def random_owner(rng):
+        return rng.randint(1, dataset.owners)
+
+    def add_and_delete_owner(d, rng, i):
+        Solution.add_owner(Owner(d.owners + 1 + i, "new owner"))
+        Solution.delete_owner(d.owners + 1 + i)
+
+    def add_and_delete_apartment(d, rng, i):
+        Solution.add_apartment(Apartment(d.apartments + 1 + i, "%d new street" % i, "Haifa", "Israel", 50))
+        Solution.delete_apartment(d.apartments + 1 + i)
+
+    def add_and_delete_customer(d, rng, i):
+        Solution.add_customer(Customer(d.customers + 1 + i, "new customer"))
+        Solution.delete_customer(d.customers + 1 + i)
+
+    # a stay after every loaded one, cancelled again
+    def reserve_and_cancel(d, rng, i):
+        start_date = date(2100, 1, 1) + timedelta(days=i)
+        customer_id, apartment_id = random_customer(rng), random_apartment(rng)
+        Solution.customer_made_reservation(customer_id, apartment_id, start_date, start_date + timedelta(days=2), 100)
+        Solution.customer_cancelled_reservation(customer_id, apartment_id, start_date)
+
+    # the n-th loaded reservation was reviewed for every even n
+    def update_review(d, rng, i):
+        customer_id, apartment_id, _, _, _ = d.reservation(2 * rng.randrange(d.reservations // 2 or 1), rng)
+        Solution.customer_updated_review(customer_id, apartment_id, date(2099, 1, 1), rng.randint(1, 10), "updated")
+
+    # the n-th loaded reservation was not reviewed for every odd n, there is no API to delete the review again
+    def review_and_delete(d, rng, i):
+        customer_id, apartment_id, _, _, _ = d.reservation(2 * rng.randrange(d.reservations // 2 or 1) + 1, rng)
+        Solution.customer_reviewed_apartment(customer_id, apartment_id, date(2099, 1, 1), rng.randint(1, 10), "new")
+        conn = Connector.DBConnector()
+        try:
+            conn.execute(sql.SQL("DELETE FROM Reviewed WHERE Customer_ID = {customer_id} AND ID = {apartment_id}")
+                         .format(customer_id=sql.Literal(customer_id), apartment_id=sql.Literal(apartment_id)))
+        finally:
+            conn.close()
+
+    def drop_and_own(d, rng, i):
+        apartment_id = random_apartment(rng)
+        owner_id = apartment_id % d.owners + 1
+        Solution.owner_drops_apartment(owner_id, apartment_id)
+        Solution.owner_owns_apartment(owner_id, apartment_id)
+
+    return [
+        ("get_owner", 2000, lambda d, rng, i: Solution.get_owner(random_owner(rng))),
+        ("get_apartment", 2000, lambda d, rng, i: Solution.get_apartment(random_apartment(rng))),
+        ("get_customer", 2000, lambda d, rng, i: Solution.get_customer(random_customer(rng))),
+        ("add_owner+delete_owner", 500, add_and_delete_owner),
+        ("add_apartment+delete_apartment", 500, add_and_delete_apartment),
+        ("add_customer+delete_customer", 500, add_and_delete_customer),
+        ("customer_made_reservation+customer_cancelled_reservation", 500, reserve_and_cancel),
+        ("customer_reviewed_apartment+delete review", 500, review_and_delete),
+        ("customer_updated_review", 500, update_review),
+        ("owner_drops_apartment+owner_owns_apartment", 500, drop_and_own),
+        ("get_apartment_owner", 2000, lambda d, rng, i: Solution.get_apartment_owner(random_apartment(rng))),
+        ("get_owner_apartments", 1000, lambda d, rng, i: Solution.get_owner_apartments(random_owner(rng))),
+        ("get_apartment_rating", 2000, lambda d, rng, i: Solution.get_apartment_rating(random_apartment(rng))),
+        ("get_owner_rating", 1000, lambda d, rng, i: Solution.get_owner_rating(random_owner(rng))),
+        ("get_top_customer", 20, lambda d, rng, i: Solution.get_top_customer()),
+        ("reservations_per_owner", 20, lambda d, rng, i: Solution.reservations_per_owner()),
+        ("get_all_location_owners", 20, lambda d, rng, i: Solution.get_all_location_owners()),
+        ("best_value_for_money", 20, lambda d, rng, i: Solution.best_value_for_money()),
+        ("profit_per_month", 100, lambda d, rng, i: Solution.profit_per_month(rng.randint(2015, 2030))),
+        ("get_apartment_recommendation", 100,
+         lambda d, rng, i: Solution.get_apartment_recommendation(random_customer(rng))),
+    ]
+
+
+def percentile(latencies: list, q: float) -> float:
+    return latencies[max(0, math.ceil(q * len(latencies)) - 1)]
+
+
+def measure(dataset: Dataset, name: str, calls: int, call, seed: int) -> dict:
+    rng = random.Random(seed)
+    for i in range(min(10, calls)):  # warm up the pool, the prepared statements and the buffer cache
+        call(dataset, rng, calls + i)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(calls):
+        before = time.perf_counter()
+        call(dataset, rng, i)
+        latencies.append(time.perf_counter() - before)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {"calls": calls, "throughput": calls / elapsed, "mean": elapsed / calls,
+            "p50": percentile(latencies, 0.50), "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99)}
+
+
+def run(scale: int, seed: int, only: list) -> dict:
+    dataset = Dataset(scale, seed)
+    Solution.create_tables()
+    try:
+        before = time.perf_counter()
+        dataset.load()
+        results = {"load": {"seconds": time.perf_counter() - before}}
+        for name, calls, call in operations(dataset):
+            if only and name not in only:
+                continue
+            results[name] = measure(dataset, name, calls, call, seed)
+            print("%-58s %10.1f/s  p50 %8.3f ms  p95 %8.3f ms  p99 %8.3f ms" % (
+                name, results[name]["throughput"], results[name]["p50"] * 1e3, results[name]["p95"] * 1e3,
+                results[name]["p99"] * 1e3))
+        return results
+    finally:
+        Solution.drop_tables()
+
+
+# the functions whose p50 grew by more than threshold (a fraction) against the baseline
+def regressions(results: dict, baseline: dict, threshold: float) -> list:
+    found = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if name == "load" or old is None:
+            continue
+        if result["p50"] > old["p50"] * (1 + threshold):
+            found.append((name, old["p50"], result["p50"]))
+    return found
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Solution.py benchmark suite")
+    parser.add_argument("--scale", default="1k", help="reservations to load: %s or a number" % ", ".join(SCALES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", default=[], help="benchmark only these functions")
+    parser.add_argument("--record", help="write the results to this JSON baseline")
+    parser.add_argument("--baseline", help="compare the results to this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 growth, 0.2 = 20%%")
+    parser.add_argument("--cache", action="store_true", help="keep the point lookup cache of Solution.py on")
+    parser.add_argument("--external", action="store_true", help="use database.ini instead of a throwaway cluster")
+    args = parser.parse_args(argv)
+    scale = SCALES[args.scale] if args.scale in SCALES else int(args.scale)
+
+    if not args.cache:
+        Solution.configure_cache(max_size=0)
+    if args.external:
+        results = run(scale, args.seed, args.only)
+    else:
+        with LocalPostgres() as params:
+            Connector.DBConnector.configure_pool(params=params)
+            try:
+                results = run(scale, args.seed, args.only)
+            finally:
+                Connector.DBConnector.close_pool()
+
+    document = {"scale": scale, "seed": args.seed, "python": platform.python_version(),
+                "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}
+    if args.record:
+        with open(args.record, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["scale"] != scale:
+            print("baseline was recorded at scale %d, not %d" % (baseline["scale"], scale))
+            return 2
+        found = regressions(results, baseline["results"], args.threshold)
+        for name, old, new in found:
+            print("REGRESSION %s: p50 %.3f ms -> %.3f ms" % (name, old * 1e3, new * 1e3))
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
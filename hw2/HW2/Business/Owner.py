@@ -1,4 +1,6 @@
 class Owner:
+    __slots__ = ("__id", "__name")
+
     def __init__(self, owner_id: int=None, owner_name: str=None) -> None:
         self.__id = owner_id
         self.__name = owner_name
@@ -19,9 +21,17 @@ class Owner:
     def bad_owner():
         return Owner()
 
+    # builds an Owner from an (owner_id, owner_name) row tuple
+    @staticmethod
+    def from_row(row: tuple):
+        return Owner(row[0], row[1])
+
     def __eq__(self, __value: object) -> bool:
         if type(self) != type(__value): return False
         else: return self.__id == __value.__id and self.__name == __value.__name
 
+    def __hash__(self) -> int:
+        return hash((self.__id, self.__name))
+
     def __str__(self) -> str:
         return f'owner_id={self.__id}, owner_name={self.__name}'
\ No newline at end of file
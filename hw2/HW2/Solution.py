@@ -1,8 +1,12 @@
-from typing import List, Tuple
+import bisect
+from collections import Counter
+from typing import Iterable, List, Tuple
 from psycopg2 import sql
 from datetime import date, datetime
 
 import Utility.DBConnector as Connector
+from Utility.Cache import LRUCache
+from Utility.RecommendationEngine import RecommendationEngine
 from Utility.ReturnValue import ReturnValue
 from Utility.Exceptions import DatabaseException
 
@@ -11,29 +15,442 @@ from Business.Customer import Customer
 from Business.Apartment import Apartment
 
 
+# ---------------------------------- PREPARED STATEMENTS: ----------------------------------
+
+# fixed query shapes of the API, each one is PREPAREd once per pooled connection and then only EXECUTEd
+PREPARED_STATEMENTS = {statement.name: statement for statement in [
+    Connector.PreparedStatement("add_owner", "INSERT INTO Owner VALUES($1, $2)", ["INTEGER", "TEXT"]),
+    Connector.PreparedStatement("get_owner", "SELECT * FROM Owner WHERE Owner_ID = $1", ["INTEGER"]),
+    Connector.PreparedStatement("get_owners", "SELECT * FROM Owner WHERE Owner_ID = ANY($1)", ["INTEGER[]"]),
+    Connector.PreparedStatement("delete_owner", "DELETE FROM Owner WHERE Owner_ID = $1", ["INTEGER"]),
+    Connector.PreparedStatement("add_apartment", "INSERT INTO Apartment VALUES($1, $2, $3, $4, $5)",
+                                ["INTEGER", "TEXT", "TEXT", "TEXT", "INTEGER"]),
+    Connector.PreparedStatement("get_apartment", "SELECT * FROM Apartment WHERE ID = $1", ["INTEGER"]),
+    Connector.PreparedStatement("get_apartments", "SELECT * FROM Apartment WHERE ID = ANY($1)", ["INTEGER[]"]),
+    Connector.PreparedStatement("delete_apartment", "DELETE FROM Apartment WHERE ID = $1", ["INTEGER"]),
+    Connector.PreparedStatement("add_customer", "INSERT INTO Customer VALUES($1, $2)", ["INTEGER", "TEXT"]),
+    Connector.PreparedStatement("get_customer", "SELECT * FROM Customer WHERE Customer_ID = $1", ["INTEGER"]),
+    Connector.PreparedStatement("get_customers", "SELECT * FROM Customer WHERE Customer_ID = ANY($1)",
+                                ["INTEGER[]"]),
+    Connector.PreparedStatement("delete_customer", "DELETE FROM Customer WHERE Customer_ID = $1", ["INTEGER"]),
+    Connector.PreparedStatement("customer_made_reservation",
+                                "INSERT INTO Reserved " +
+                                "SELECT $1, $2, $3, $4, $5 " +
+                                "WHERE NOT EXISTS (SELECT 1 FROM Reserved AS R " +
+                                "WHERE R.id = $2 AND " +
+                                "daterange(R.start_date, GREATEST(R.end_date, R.start_date + 1)) && " +
+                                "daterange($3, GREATEST($4, $3 + 1)))",
+                                ["INTEGER", "INTEGER", "DATE", "DATE", "FLOAT"]),
+    Connector.PreparedStatement("customer_cancelled_reservation",
+                                "DELETE FROM Reserved WHERE " +
+                                "Customer_ID = $1 AND ID = $2 AND start_date = $3",
+                                ["INTEGER", "INTEGER", "DATE"]),
+    Connector.PreparedStatement("customer_reviewed_apartment",
+                                "INSERT INTO Reviewed " +
+                                "SELECT $2, $1, $3, $4, $5 " +
+                                "WHERE EXISTS (SELECT 1 FROM Reserved AS R " +
+                                "WHERE R.id = $2 AND R.Customer_ID = $1 " +
+                                "AND R.end_date <= $3)",
+                                ["INTEGER", "INTEGER", "DATE", "INTEGER", "TEXT"]),
+    Connector.PreparedStatement("customer_updated_review",
+                                "UPDATE Reviewed " +
+                                "SET review_date = $3, rating = $4, review_text = $5 " +
+                                "WHERE id = $2 AND Customer_ID = $1 " +
+                                "AND review_date <= $3",
+                                ["INTEGER", "INTEGER", "DATE", "INTEGER", "TEXT"]),
+    Connector.PreparedStatement("owner_owns_apartment", "INSERT INTO Owns SELECT $1, $2", ["INTEGER", "INTEGER"]),
+    Connector.PreparedStatement("owner_drops_apartment", "DELETE FROM Owns WHERE id = $2 AND Owner_id = $1",
+                                ["INTEGER", "INTEGER"]),
+    Connector.PreparedStatement("get_apartment_owner",
+                                "SELECT * FROM Owner O " +
+                                "WHERE EXISTS (SELECT 1 FROM Owns " +
+                                "WHERE id = $1 AND O.Owner_ID = Owner_ID)",
+                                ["INTEGER"]),
+    Connector.PreparedStatement("get_owner_apartments",
+                                "SELECT * FROM Apartment AP " +
+                                "WHERE EXISTS (SELECT 1 FROM Owns " +
+                                "WHERE id = AP.id AND Owner_ID = $1)",
+                                ["INTEGER"]),
+    Connector.PreparedStatement("get_apartment_rating",
+                                "SELECT average_rating FROM Apartment_Rating WHERE id = $1", ["INTEGER"]),
+    Connector.PreparedStatement("get_owner_rating",
+                                "SELECT COALESCE(AVG(average_rating),0) AS owner_rating FROM Apartment_Rating AR " +
+                                "WHERE EXISTS (SELECT 1 FROM Owns " +
+                                "WHERE id = AR.id AND owner_id = $1)",
+                                ["INTEGER"]),
+    Connector.PreparedStatement("get_top_customer",
+                                "SELECT Customer_id, Customer_name " +
+                                "FROM Customer_reservations " +
+                                "WHERE num_reservations = (SELECT MAX(num_reservations) FROM Customer_reservations) " +
+                                "ORDER BY Customer_id " +
+                                "LIMIT 1"),
+    Connector.PreparedStatement("reservations_per_owner",
+                                "SELECT O.Owner_id, Owner_name, S.reservations AS num_reservations " +
+                                "FROM Owner O JOIN Owner_Stats S ON O.Owner_id = S.Owner_id"),
+    Connector.PreparedStatement("get_all_location_owners",
+                                "SELECT Owner_id, Owner_name " +
+                                "FROM Owner_cities_count " +
+                                "WHERE num_cities = (SELECT COUNT(*) FROM Locations) " +
+                                "AND num_cities > 0"),
+    Connector.PreparedStatement("best_value_for_money",
+                                "SELECT A.ID, Address, City, Country, Size " +
+                                "FROM Apartment A JOIN Apartment_VFM_scores S ON A.ID = S.ID " +
+                                "WHERE score = (SELECT MAX(score) FROM Apartment_VFM_scores) " +
+                                "ORDER BY A.ID " +
+                                "LIMIT 1"),
+    Connector.PreparedStatement("profit_per_month",
+                                "SELECT M.month, COALESCE(CAST(R.revenue AS FLOAT), 0) * 0.15 AS profit " +
+                                "FROM generate_series(1, 12) AS M(month) " +
+                                "LEFT OUTER JOIN (SELECT month, SUM(revenue) AS revenue FROM Monthly_Revenue " +
+                                "WHERE year = $1 GROUP BY month) R ON R.month = M.month " +
+                                "ORDER BY M.month",
+                                ["INTEGER"]),
+    Connector.PreparedStatement("profit_per_month_range",
+                                "SELECT Y.year, M.month, COALESCE(CAST(R.revenue AS FLOAT), 0) * 0.15 AS profit " +
+                                "FROM generate_series($1, $2) AS Y(year) CROSS JOIN generate_series(1, 12) AS M(month) " +
+                                "LEFT OUTER JOIN (SELECT year, month, SUM(revenue) AS revenue FROM Monthly_Revenue " +
+                                "WHERE year BETWEEN $1 AND $2 GROUP BY year, month) R " +
+                                "ON R.year = Y.year AND R.month = M.month " +
+                                "ORDER BY Y.year, M.month",
+                                ["INTEGER", "INTEGER"]),
+    Connector.PreparedStatement("get_apartment_recommendation",
+                                "SELECT A.ID AS ID, Address, City, Country, Size, " +
+                                "AVG(GREATEST(LEAST(RR.ratio * RE.rating, 10), 1)) AS approx " +
+                                "FROM Apartment A " +
+                                "JOIN Reviewed RE ON A.ID = RE.ID " +
+                                "JOIN Rating_Ratios RR ON RR.cid2 = RE.Customer_id " +
+                                "WHERE RR.cid1 = $1 " +
+                                "AND NOT EXISTS (SELECT * FROM Reviewed WHERE ID = A.ID AND Customer_id = $1) " +
+                                "GROUP BY A.ID, Address, City, Country, Size " +
+                                "ORDER BY A.ID",
+                                ["INTEGER"]),
+]}
+
+
+# rows of get_owner, get_apartment, get_customer and get_apartment_owner, keyed by (function, id).
+# only rows that exist are cached, so adding rows never makes an entry stale, the delete functions and
+# owner_drops_apartment invalidate what they (and the ON DELETE CASCADEs) remove.
+# writes made outside this process are seen once the entries expire.
+# the cached lookups always read the primary, a lagging read replica could put back a row that was just deleted.
+# the other read functions use DBConnector(read_only=True) and are served by a replica, if there are any
+_cache = LRUCache()
+
+# optional in-process engine serving get_apartment_recommendation, see enable_recommendation_engine()
+_recommendation_engine = None
+
+
+# rows per month of Monthly_Revenue. a booking only updates the row of its apartment's shard (ID % REVENUE_SHARDS),
+# so concurrent bookings of different apartments rarely wait for each other, and profit_per_month sums the shards
+REVENUE_SHARDS = 16
+
+
+# secondary indexes of the access paths above, created by create_tables and dropped along with their tables.
+# primary keys index Owner, Apartment, Customer, Owns(ID) and Reviewed(ID, Customer_ID),
+# and the no overlap exclusion constraint (the Reserved_stay index under "range" partitioning) indexes Reserved(ID, stay)
+INDEXES = [
+    # get_owner_apartments, get_owner_rating, reservations_per_owner, deleting an owner
+    "CREATE INDEX Owns_Owner_ID ON Owns(Owner_ID);",
+    # customer_cancelled_reservation, customer_reviewed_apartment, Customer_reservations, deleting a customer
+    "CREATE INDEX Reserved_Customer_ID ON Reserved(Customer_ID, ID, start_date);",
+    # get_apartment_recommendation, deleting a customer
+    "CREATE INDEX Reviewed_Customer_ID ON Reviewed(Customer_ID);",
+    # get_all_location_owners
+    "CREATE INDEX Owner_Stats_num_locations ON Owner_Stats(num_locations);",
+]
+
+
+# ---------------------------------- CACHE: ----------------------------------
+
+# replaces the cache of the point lookups, max_size=0 turns it off
+def configure_cache(max_size: int = 4096, ttl: float = 60.0) -> None:
+    global _cache
+    _cache = LRUCache(max_size, ttl)
+
+
+# hit, miss and eviction counters of the cache and its size
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+# drops the cache entries of keys, and those for which where(key, row) is true, that a write on conn made stale.
+# inside a transaction() scope they are dropped again once it commits: until then other threads still read
+# the old rows and may cache them meanwhile
+def _invalidate(conn: Connector.DBConnector, keys: List[tuple], where=None) -> None:
+    def invalidate():
+        for key in keys:
+            _cache.invalidate(key)
+        if where is not None:
+            _cache.invalidate_where(where)
+
+    invalidate()
+    if conn.in_transaction():
+        conn.after_commit(invalidate)
+
+
+# caches a row read on conn, unless it was read inside a transaction() scope that may still roll back
+def _cache_row(conn: Connector.DBConnector, key: tuple, row: tuple, version: int) -> None:
+    if not conn.in_transaction():
+        _cache.put(key, row, version)
+
+
+# ---------------------------------- PARTITIONING: ----------------------------------
+
+# layout create_tables gives Reserved and Reviewed, the tables that grow with the traffic, see configure_partitioning()
+_partitioning = {"scheme": None, "partitions": 8, "first_year": 2000, "last_year": 2040}
+
+
+# how the next create_tables() creates Reserved and Reviewed
+# scheme - None for plain tables,
+#          "hash" for Reserved and Reviewed split into partitions by apartment ID, so the per apartment queries
+#          (bookings, cancellations, reviews, ratings) only touch one partition and its indexes stay small,
+#          "range" for Reserved split by the year of end_date (and Reviewed by apartment ID)
+# partitions - number of hash partitions
+# first_year, last_year - years of end_date with a Reserved partition of their own under "range",
+#                         the other reservations go to a default partition
+def configure_partitioning(scheme: str = None, partitions: int = 8, first_year: int = 2000,
+                           last_year: int = 2040) -> None:
+    if scheme not in (None, "hash", "range"):
+        raise ValueError("unknown partitioning scheme: " + str(scheme))
+    if partitions < 1 or first_year > last_year:
+        raise ValueError("invalid partitioning: partitions=%d, years %d-%d" % (partitions, first_year, last_year))
+    _partitioning.update(scheme=scheme, partitions=partitions, first_year=first_year, last_year=last_year)
+
+
+# CREATE statements of Reserved and Reviewed under the configured partitioning.
+# a constraint on a partitioned table has to include the partition key, so:
+# - under "hash" every Reserved partition gets its own no overlap exclusion constraint, which is enough since all
+#   reservations of an apartment are in the same partition
+# - under "range" the reservations of an apartment are spread over partitions and a trigger does the overlap check.
+#   it locks the apartment's Apartment_Stats row first, so concurrent bookings of an apartment are checked one after
+#   the other and each sees the reservations committed before it. Solution.py never moves a reservation,
+#   so only inserts are checked
+def _growing_tables() -> List[str]:
+    scheme = _partitioning["scheme"]
+    stay = "daterange(start_date, GREATEST(end_date, start_date + 1))"
+    reserved = "CREATE TABLE Reserved(Customer_ID INTEGER, ID INTEGER, start_date DATE, end_date DATE, total_price FLOAT, FOREIGN KEY(ID) REFERENCES Apartment ON DELETE CASCADE, FOREIGN KEY(Customer_ID) REFERENCES Customer ON DELETE CASCADE"
+    reviewed = "CREATE TABLE Reviewed(ID INTEGER, Customer_ID INTEGER, review_date DATE, rating INTEGER, review_text TEXT, PRIMARY KEY(ID, Customer_ID), FOREIGN KEY(ID) REFERENCES Apartment ON DELETE CASCADE, FOREIGN KEY(Customer_ID) REFERENCES Customer ON DELETE CASCADE)"
+    if scheme is None:
+        # the exclusion constraint keeps the reservations of an apartment from overlapping and its GiST index
+        # turns the overlap check of a booking into an index probe. a one day stay starts at start_date even
+        # when end_date = start_date, so the ranges overlap exactly when the (start_date, end_date) periods do
+        return [reserved + ", CONSTRAINT Reserved_no_overlap EXCLUDE USING gist (ID WITH =, " + stay + " WITH &&));",
+                reviewed + ";"]
+
+    queries = []
+    if scheme == "hash":
+        queries.append(reserved + ") PARTITION BY HASH (ID);")
+        for i in range(_partitioning["partitions"]):
+            queries.append("CREATE TABLE Reserved_%d PARTITION OF Reserved (CONSTRAINT Reserved_%d_no_overlap EXCLUDE USING gist (ID WITH =, %s WITH &&)) FOR VALUES WITH (MODULUS %d, REMAINDER %d);"
+                           % (i, i, stay, _partitioning["partitions"], i))
+    else:
+        queries.append(reserved + ") PARTITION BY RANGE (end_date);")
+        for year in range(_partitioning["first_year"], _partitioning["last_year"] + 1):
+            queries.append("CREATE TABLE Reserved_%d PARTITION OF Reserved FOR VALUES FROM ('%d-01-01') TO ('%d-01-01');"
+                           % (year, year, year + 1))
+        queries += ["CREATE TABLE Reserved_default PARTITION OF Reserved DEFAULT;",
+                    "CREATE INDEX Reserved_stay ON Reserved USING gist (ID, " + stay + ");",
+                    "CREATE FUNCTION Reserved_no_overlap() RETURNS TRIGGER AS $$ " +
+                    "BEGIN " +
+                    "PERFORM 1 FROM Apartment_Stats WHERE ID = NEW.ID FOR UPDATE; " +
+                    "IF EXISTS (SELECT 1 FROM Reserved WHERE ID = NEW.ID AND " + stay + " && daterange(NEW.start_date, GREATEST(NEW.end_date, NEW.start_date + 1))) THEN " +
+                    "RAISE EXCEPTION 'reservation of apartment % overlaps another one', NEW.ID USING ERRCODE = 'exclusion_violation'; " +
+                    "END IF; " +
+                    "RETURN NEW; " +
+                    "END; $$ LANGUAGE plpgsql;",
+                    "CREATE TRIGGER Reserved_no_overlap BEFORE INSERT ON Reserved FOR EACH ROW EXECUTE FUNCTION Reserved_no_overlap();"]
+
+    queries.append(reviewed + " PARTITION BY HASH (ID);")
+    for i in range(_partitioning["partitions"]):
+        queries.append("CREATE TABLE Reviewed_%d PARTITION OF Reviewed FOR VALUES WITH (MODULUS %d, REMAINDER %d);"
+                       % (i, _partitioning["partitions"], i))
+    return queries
+
+
 # ---------------------------------- CRUD API: ----------------------------------
 
 def create_tables():
-    queries = ["CREATE TABLE Owner(Owner_ID INTEGER , Owner_name TEXT, PRIMARY KEY(Owner_ID), CHECK(Owner_ID > 0));",
+    queries = ["CREATE EXTENSION IF NOT EXISTS btree_gist;",
+               "CREATE TABLE Owner(Owner_ID INTEGER , Owner_name TEXT, PRIMARY KEY(Owner_ID), CHECK(Owner_ID > 0));",
                "CREATE TABLE Apartment(ID INTEGER, Address TEXT, City TEXT, Country TEXT, Size INTEGER, UNIQUE(City, Address), PRIMARY KEY(ID), CHECK(ID > 0));",
                "CREATE TABLE Customer(Customer_ID INTEGER, Customer_name TEXT, PRIMARY KEY(Customer_ID), CHECK(Customer_ID > 0));",
                "CREATE TABLE Owns(Owner_ID INTEGER, ID INTEGER, PRIMARY KEY(ID) ,FOREIGN KEY(ID) REFERENCES Apartment(ID) ON DELETE CASCADE, FOREIGN KEY(Owner_ID) REFERENCES Owner ON DELETE CASCADE);",
-               "CREATE TABLE Reserved(Customer_ID INTEGER, ID INTEGER, start_date DATE, end_date DATE, total_price FLOAT, FOREIGN KEY(ID) REFERENCES Apartment ON DELETE CASCADE, FOREIGN KEY(Customer_ID) REFERENCES Customer ON DELETE CASCADE);",
-               "CREATE TABLE Reviewed(ID INTEGER, Customer_ID INTEGER, review_date DATE, rating INTEGER, review_text TEXT, PRIMARY KEY(ID, Customer_ID), FOREIGN KEY(ID) REFERENCES Apartment ON DELETE CASCADE, FOREIGN KEY(Customer_ID) REFERENCES Customer ON DELETE CASCADE);",
-               "CREATE VIEW Apartment_Rating AS SELECT A.ID, AVG(COALESCE(rating, 0)) AS average_rating FROM Apartment A LEFT OUTER JOIN Reviewed R ON A.ID = R.ID GROUP BY A.ID;",
+               # Reserved and Reviewed, plain or partitioned
+               *_growing_tables(),
+               # running sums and counts behind the rating and price per night averages of each apartment,
+               # kept up to date by triggers on Apartment, Reviewed and Reserved so the views below are point reads
+               "CREATE TABLE Apartment_Stats(ID INTEGER, rating_sum BIGINT NOT NULL DEFAULT 0, rating_count INTEGER NOT NULL DEFAULT 0, ppn_sum NUMERIC NOT NULL DEFAULT 0, ppn_count INTEGER NOT NULL DEFAULT 0, reservation_count INTEGER NOT NULL DEFAULT 0, PRIMARY KEY(ID), FOREIGN KEY(ID) REFERENCES Apartment ON DELETE CASCADE);",
+               "CREATE FUNCTION Apartment_Stats_on_apartment() RETURNS TRIGGER AS $$ " +
+               "BEGIN " +
+               "INSERT INTO Apartment_Stats(ID) VALUES(NEW.ID); " +
+               "RETURN NULL; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Apartment_Stats_on_apartment AFTER INSERT ON Apartment FOR EACH ROW EXECUTE FUNCTION Apartment_Stats_on_apartment();",
+               "CREATE FUNCTION Apartment_Stats_on_reviewed() RETURNS TRIGGER AS $$ " +
+               "BEGIN " +
+               "IF TG_OP IN ('UPDATE', 'DELETE') THEN " +
+               "UPDATE Apartment_Stats SET rating_sum = rating_sum - OLD.rating, rating_count = rating_count - 1 WHERE ID = OLD.ID; " +
+               "END IF; " +
+               "IF TG_OP IN ('INSERT', 'UPDATE') THEN " +
+               "UPDATE Apartment_Stats SET rating_sum = rating_sum + NEW.rating, rating_count = rating_count + 1 WHERE ID = NEW.ID; " +
+               "END IF; " +
+               "RETURN NULL; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Apartment_Stats_on_reviewed AFTER INSERT OR UPDATE OR DELETE ON Reviewed FOR EACH ROW EXECUTE FUNCTION Apartment_Stats_on_reviewed();",
+               # a reservation of zero nights has no price per night and is left out of the average.
+               # the prices per night are summed as NUMERIC, so a cancellation subtracts exactly what its
+               # reservation added and the average is computed in FLOAT only by the view.
+               # the reservation is also counted for the apartment and for its owner, the apartment's row is
+               # updated (and so locked) first, see Owner_Stats_on_owns
+               "CREATE FUNCTION Apartment_Stats_on_reserved() RETURNS TRIGGER AS $$ " +
+               "BEGIN " +
+               "IF TG_OP IN ('UPDATE', 'DELETE') THEN " +
+               "UPDATE Apartment_Stats SET reservation_count = reservation_count - 1, " +
+               "ppn_sum = ppn_sum - CASE WHEN OLD.end_date > OLD.start_date THEN CAST(OLD.total_price / (OLD.end_date - OLD.start_date) AS NUMERIC) ELSE 0 END, " +
+               "ppn_count = ppn_count - CASE WHEN OLD.end_date > OLD.start_date THEN 1 ELSE 0 END WHERE ID = OLD.ID; " +
+               "UPDATE Owner_Stats SET reservations = reservations - 1 WHERE Owner_ID IN (SELECT Owner_ID FROM Owns WHERE ID = OLD.ID); " +
+               "END IF; " +
+               "IF TG_OP IN ('INSERT', 'UPDATE') THEN " +
+               "UPDATE Apartment_Stats SET reservation_count = reservation_count + 1, " +
+               "ppn_sum = ppn_sum + CASE WHEN NEW.end_date > NEW.start_date THEN CAST(NEW.total_price / (NEW.end_date - NEW.start_date) AS NUMERIC) ELSE 0 END, " +
+               "ppn_count = ppn_count + CASE WHEN NEW.end_date > NEW.start_date THEN 1 ELSE 0 END WHERE ID = NEW.ID; " +
+               "UPDATE Owner_Stats SET reservations = reservations + 1 WHERE Owner_ID IN (SELECT Owner_ID FROM Owns WHERE ID = NEW.ID); " +
+               "END IF; " +
+               "RETURN NULL; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Apartment_Stats_on_reserved AFTER INSERT OR UPDATE OR DELETE ON Reserved FOR EACH ROW EXECUTE FUNCTION Apartment_Stats_on_reserved();",
+               "CREATE VIEW Apartment_Rating AS SELECT ID, CASE WHEN rating_count = 0 THEN 0 ELSE CAST(rating_sum AS decimal) / rating_count END AS average_rating FROM Apartment_Stats;",
                "CREATE VIEW Customer_reservations AS SELECT C.Customer_id, C.Customer_name, COUNT(R.start_date) AS num_reservations FROM Customer C LEFT OUTER JOIN Reserved R ON C.Customer_id = R.Customer_id GROUP BY C.Customer_id, C.Customer_name;",
-               "CREATE VIEW Apartment_Average_price_per_night AS SELECT RS.ID, AVG(RS.total_price / (RS.end_date - RS.start_date)) as average_ppn FROM Reserved RS GROUP BY RS.ID",
+               "CREATE VIEW Apartment_Average_price_per_night AS SELECT ID, CAST(ppn_sum AS FLOAT) / ppn_count as average_ppn FROM Apartment_Stats WHERE ppn_count > 0",
                "CREATE VIEW Apartment_VFM_scores AS SELECT R.ID, COALESCE(average_rating / average_ppn, 0) as score FROM Apartment_Rating R LEFT OUTER JOIN Apartment_Average_price_per_night PPN ON R.ID = PPN.ID",
-               "CREATE VIEW Rating_Ratios AS SELECT R1.Customer_id AS cid1 , R2.Customer_id AS cid2, AVG(CAST(R1.rating AS decimal)/R2.rating) AS ratio FROM Reviewed R1, Reviewed R2 WHERE R1.Customer_id != R2.Customer_id AND R1.ID = R2.ID GROUP BY R1.Customer_id, R2.Customer_id",
+               # sum and count of rating ratios of every pair of customers that reviewed a common apartment.
+               # a statement trigger on Reviewed updates only the pairs of the reviews it changed,
+               # reviews of the same apartment are serialized on its Apartment_Stats row.
+               # updates are expected to keep (ID, Customer_ID), as customer_updated_review does.
+               # a pair is deleted when its last common apartment goes, so the table only holds related customers
+               "CREATE TABLE Rating_Ratio_Stats(cid1 INTEGER, cid2 INTEGER, ratio_sum DECIMAL NOT NULL, ratio_count INTEGER NOT NULL, PRIMARY KEY(cid1, cid2));",
+               "CREATE FUNCTION Rating_Ratios_on_reviewed() RETURNS TRIGGER AS $$ " +
+               "BEGIN " +
+               "IF TG_OP IN ('UPDATE', 'DELETE') THEN " +
+               "PERFORM 1 FROM Apartment_Stats WHERE ID IN (SELECT ID FROM Old_Reviews) ORDER BY ID FOR UPDATE; " +
+               "WITH Before_Rows AS (" +
+               "SELECT ID, Customer_ID, rating, TRUE AS changed FROM Old_Reviews " +
+               "UNION ALL " +
+               "SELECT R.ID, R.Customer_ID, R.rating, FALSE FROM Reviewed R WHERE R.ID IN (SELECT ID FROM Old_Reviews) " +
+               "AND NOT EXISTS (SELECT 1 FROM Old_Reviews O WHERE O.ID = R.ID AND O.Customer_ID = R.Customer_ID)), " +
+               "Pairs AS (" +
+               "SELECT R1.Customer_ID AS cid1, R2.Customer_ID AS cid2, SUM(CAST(R1.rating AS decimal)/R2.rating) AS ratio_sum, COUNT(*) AS ratio_count " +
+               "FROM Before_Rows R1 JOIN Before_Rows R2 ON R1.ID = R2.ID AND R1.Customer_ID != R2.Customer_ID " +
+               "WHERE R1.changed OR R2.changed GROUP BY R1.Customer_ID, R2.Customer_ID), " +
+               "Emptied AS (" +
+               "DELETE FROM Rating_Ratio_Stats S USING Pairs P WHERE S.cid1 = P.cid1 AND S.cid2 = P.cid2 AND S.ratio_count = P.ratio_count) " +
+               "UPDATE Rating_Ratio_Stats S SET ratio_sum = S.ratio_sum - P.ratio_sum, ratio_count = S.ratio_count - P.ratio_count " +
+               "FROM Pairs P WHERE S.cid1 = P.cid1 AND S.cid2 = P.cid2 AND S.ratio_count <> P.ratio_count; " +
+               "END IF; " +
+               "IF TG_OP IN ('INSERT', 'UPDATE') THEN " +
+               "PERFORM 1 FROM Apartment_Stats WHERE ID IN (SELECT ID FROM New_Reviews) ORDER BY ID FOR UPDATE; " +
+               "WITH After_Rows AS (" +
+               "SELECT R.ID, R.Customer_ID, R.rating, EXISTS (SELECT 1 FROM New_Reviews N WHERE N.ID = R.ID AND N.Customer_ID = R.Customer_ID) AS changed " +
+               "FROM Reviewed R WHERE R.ID IN (SELECT ID FROM New_Reviews)), " +
+               "Pairs AS (" +
+               "SELECT R1.Customer_ID AS cid1, R2.Customer_ID AS cid2, SUM(CAST(R1.rating AS decimal)/R2.rating) AS ratio_sum, COUNT(*) AS ratio_count " +
+               "FROM After_Rows R1 JOIN After_Rows R2 ON R1.ID = R2.ID AND R1.Customer_ID != R2.Customer_ID " +
+               "WHERE R1.changed OR R2.changed GROUP BY R1.Customer_ID, R2.Customer_ID) " +
+               "INSERT INTO Rating_Ratio_Stats SELECT cid1, cid2, ratio_sum, ratio_count FROM Pairs " +
+               "ON CONFLICT (cid1, cid2) DO UPDATE SET ratio_sum = Rating_Ratio_Stats.ratio_sum + EXCLUDED.ratio_sum, ratio_count = Rating_Ratio_Stats.ratio_count + EXCLUDED.ratio_count; " +
+               "END IF; " +
+               "RETURN NULL; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Rating_Ratios_on_insert AFTER INSERT ON Reviewed REFERENCING NEW TABLE AS New_Reviews FOR EACH STATEMENT EXECUTE FUNCTION Rating_Ratios_on_reviewed();",
+               "CREATE TRIGGER Rating_Ratios_on_update AFTER UPDATE ON Reviewed REFERENCING OLD TABLE AS Old_Reviews NEW TABLE AS New_Reviews FOR EACH STATEMENT EXECUTE FUNCTION Rating_Ratios_on_reviewed();",
+               "CREATE TRIGGER Rating_Ratios_on_delete AFTER DELETE ON Reviewed REFERENCING OLD TABLE AS Old_Reviews FOR EACH STATEMENT EXECUTE FUNCTION Rating_Ratios_on_reviewed();",
+               "CREATE VIEW Rating_Ratios AS SELECT cid1, cid2, ratio_sum / ratio_count AS ratio FROM Rating_Ratio_Stats WHERE ratio_count > 0",
+               # total price of the reservations ending in each month, split in REVENUE_SHARDS shards by apartment and
+               # kept up to date by statement triggers on Reserved, so profit_per_month reads 12 * REVENUE_SHARDS rows
+               # at most. NUMERIC, so cancellations subtract exactly
+               "CREATE TABLE Monthly_Revenue(year INTEGER, month INTEGER, shard INTEGER, revenue NUMERIC NOT NULL, PRIMARY KEY(year, month, shard));",
+               "CREATE FUNCTION Monthly_Revenue_on_reserved() RETURNS TRIGGER AS $$ " +
+               "BEGIN " +
+               "IF TG_OP IN ('UPDATE', 'DELETE') THEN " +
+               "UPDATE Monthly_Revenue M SET revenue = M.revenue - O.revenue " +
+               "FROM (SELECT CAST(EXTRACT(YEAR FROM end_date) AS INTEGER) AS year, CAST(EXTRACT(MONTH FROM end_date) AS INTEGER) AS month, ID %% %d AS shard, SUM(CAST(total_price AS NUMERIC)) AS revenue " % REVENUE_SHARDS +
+               "FROM Old_Reserved GROUP BY 1, 2, 3) O " +
+               "WHERE M.year = O.year AND M.month = O.month AND M.shard = O.shard; " +
+               "END IF; " +
+               "IF TG_OP IN ('INSERT', 'UPDATE') THEN " +
+               "INSERT INTO Monthly_Revenue " +
+               "SELECT CAST(EXTRACT(YEAR FROM end_date) AS INTEGER), CAST(EXTRACT(MONTH FROM end_date) AS INTEGER), ID %% %d, SUM(CAST(total_price AS NUMERIC)) " % REVENUE_SHARDS +
+               "FROM New_Reserved GROUP BY 1, 2, 3 ORDER BY 1, 2, 3 " +
+               "ON CONFLICT (year, month, shard) DO UPDATE SET revenue = Monthly_Revenue.revenue + EXCLUDED.revenue; " +
+               "END IF; " +
+               "RETURN NULL; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Monthly_Revenue_on_insert AFTER INSERT ON Reserved REFERENCING NEW TABLE AS New_Reserved FOR EACH STATEMENT EXECUTE FUNCTION Monthly_Revenue_on_reserved();",
+               "CREATE TRIGGER Monthly_Revenue_on_update AFTER UPDATE ON Reserved REFERENCING OLD TABLE AS Old_Reserved NEW TABLE AS New_Reserved FOR EACH STATEMENT EXECUTE FUNCTION Monthly_Revenue_on_reserved();",
+               "CREATE TRIGGER Monthly_Revenue_on_delete AFTER DELETE ON Reserved REFERENCING OLD TABLE AS Old_Reserved FOR EACH STATEMENT EXECUTE FUNCTION Monthly_Revenue_on_reserved();",
+               # the (City, Country) locations of all apartments and of each owner's apartments, as multisets
+               # (location -> number of apartments there), and per owner the reservations of the apartments it owns
+               # and its number of distinct locations. kept up to date by triggers on Owner, Apartment, Owns and
+               # Reserved, so reservations_per_owner and get_all_location_owners read them instead of aggregating
+               "CREATE TABLE Locations(City TEXT, Country TEXT, apartments INTEGER NOT NULL, PRIMARY KEY(City, Country));",
+               "CREATE TABLE Owner_Locations(Owner_ID INTEGER, City TEXT, Country TEXT, apartments INTEGER NOT NULL, PRIMARY KEY(Owner_ID, City, Country), FOREIGN KEY(Owner_ID) REFERENCES Owner ON DELETE CASCADE);",
+               "CREATE TABLE Owner_Stats(Owner_ID INTEGER, reservations BIGINT NOT NULL DEFAULT 0, num_locations INTEGER NOT NULL DEFAULT 0, PRIMARY KEY(Owner_ID), FOREIGN KEY(Owner_ID) REFERENCES Owner ON DELETE CASCADE);",
+               "CREATE FUNCTION Owner_Stats_on_owner() RETURNS TRIGGER AS $$ " +
+               "BEGIN " +
+               "INSERT INTO Owner_Stats(Owner_ID) VALUES(NEW.Owner_ID); " +
+               "RETURN NULL; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Owner_Stats_on_owner AFTER INSERT ON Owner FOR EACH ROW EXECUTE FUNCTION Owner_Stats_on_owner();",
+               "CREATE FUNCTION Locations_on_apartment() RETURNS TRIGGER AS $$ " +
+               "BEGIN " +
+               "IF TG_OP IN ('UPDATE', 'DELETE') THEN " +
+               "UPDATE Locations SET apartments = apartments - 1 WHERE City = OLD.City AND Country = OLD.Country; " +
+               "DELETE FROM Locations WHERE City = OLD.City AND Country = OLD.Country AND apartments = 0; " +
+               "END IF; " +
+               "IF TG_OP IN ('INSERT', 'UPDATE') THEN " +
+               "INSERT INTO Locations VALUES(NEW.City, NEW.Country, 1) ON CONFLICT (City, Country) DO UPDATE SET apartments = Locations.apartments + 1; " +
+               "END IF; " +
+               "RETURN NULL; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Locations_on_apartment AFTER INSERT OR UPDATE OR DELETE ON Apartment FOR EACH ROW EXECUTE FUNCTION Locations_on_apartment();",
+               # an apartment leaves its owner's statistics before its Apartment_Stats row and reservations cascade away
+               "CREATE FUNCTION Owns_on_apartment_delete() RETURNS TRIGGER AS $$ " +
+               "BEGIN " +
+               "DELETE FROM Owns WHERE ID = OLD.ID; " +
+               "RETURN OLD; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Owns_on_apartment_delete BEFORE DELETE ON Apartment FOR EACH ROW EXECUTE FUNCTION Owns_on_apartment_delete();",
+               # the apartment's Apartment_Stats row is locked before its reservations are counted, so a concurrent
+               # reservation is either counted here or finds the new owner in Apartment_Stats_on_reserved.
+               # a missing apartment is left to the foreign key check, which runs after this trigger
+               "CREATE FUNCTION Owner_Stats_on_owns() RETURNS TRIGGER AS $$ " +
+               "DECLARE v_city TEXT; v_country TEXT; v_reservations INTEGER; v_apartments INTEGER; " +
+               "BEGIN " +
+               "IF TG_OP IN ('UPDATE', 'DELETE') THEN " +
+               "SELECT reservation_count INTO v_reservations FROM Apartment_Stats WHERE ID = OLD.ID FOR UPDATE; " +
+               "SELECT City, Country INTO v_city, v_country FROM Apartment WHERE ID = OLD.ID; " +
+               "UPDATE Owner_Locations SET apartments = apartments - 1 WHERE Owner_ID = OLD.Owner_ID AND City = v_city AND Country = v_country RETURNING apartments INTO v_apartments; " +
+               "DELETE FROM Owner_Locations WHERE Owner_ID = OLD.Owner_ID AND City = v_city AND Country = v_country AND apartments = 0; " +
+               "UPDATE Owner_Stats SET reservations = reservations - COALESCE(v_reservations, 0), num_locations = num_locations - CASE WHEN v_apartments = 0 THEN 1 ELSE 0 END WHERE Owner_ID = OLD.Owner_ID; " +
+               "END IF; " +
+               "IF TG_OP IN ('INSERT', 'UPDATE') THEN " +
+               "SELECT reservation_count INTO v_reservations FROM Apartment_Stats WHERE ID = NEW.ID FOR UPDATE; " +
+               "SELECT City, Country INTO v_city, v_country FROM Apartment WHERE ID = NEW.ID; " +
+               "IF NOT FOUND THEN RETURN NULL; END IF; " +
+               "INSERT INTO Owner_Locations VALUES(NEW.Owner_ID, v_city, v_country, 1) ON CONFLICT (Owner_ID, City, Country) DO UPDATE SET apartments = Owner_Locations.apartments + 1 RETURNING apartments INTO v_apartments; " +
+               "UPDATE Owner_Stats SET reservations = reservations + COALESCE(v_reservations, 0), num_locations = num_locations + CASE WHEN v_apartments = 1 THEN 1 ELSE 0 END WHERE Owner_ID = NEW.Owner_ID; " +
+               "END IF; " +
+               "RETURN NULL; " +
+               "END; $$ LANGUAGE plpgsql;",
+               "CREATE TRIGGER Owner_Stats_on_owns AFTER INSERT OR UPDATE OR DELETE ON Owns FOR EACH ROW EXECUTE FUNCTION Owner_Stats_on_owns();",
                # adi
-               "CREATE VIEW Owner_cities_count AS (SELECT O.Owner_id, O.Owner_name, COUNT(DISTINCT (A.City, A.Country)) AS num_cities FROM (Owner O LEFT OUTER JOIN Owns OW ON O.Owner_id = OW.Owner_id) LEFT OUTER JOIN Apartment A ON OW.id = A.id GROUP BY O.Owner_id, O.Owner_name);"]
+               "CREATE VIEW Owner_cities_count AS (SELECT O.Owner_id, O.Owner_name, S.num_locations AS num_cities FROM Owner O JOIN Owner_Stats S ON O.Owner_id = S.Owner_id);"]
+    queries += INDEXES
 
 
     conn = None
     try:
         conn = Connector.DBConnector()
-        for query in queries:
-            conn.execute(query)
+        conn.execute_many(queries)
 
     except Exception as e:
         print(e)
@@ -42,7 +459,9 @@ def create_tables():
 
 
 def clear_tables():
-    queries = ["DELETE FROM Owner;",
+    queries = ["DELETE FROM Monthly_Revenue;",
+               "DELETE FROM Rating_Ratio_Stats;",
+               "DELETE FROM Owner;",
                "DELETE FROM Apartment;",
                "DELETE FROM Customer;",
                "DELETE FROM Owns;",
@@ -53,8 +472,9 @@ def clear_tables():
     conn = None
     try:
         conn = Connector.DBConnector()
-        for query in queries:
-            conn.execute(query)
+        conn.execute_many(queries)
+        _reviews_written(conn, lambda engine: engine.clear())
+        _cache.clear()
 
     except Exception as e:
         print(e)
@@ -63,12 +483,29 @@ def clear_tables():
 
 
 def drop_tables():
-    queries = ["DROP TABLE Owner;",
+    # the function only exists when Reserved was created with "range" partitioning
+    queries = ["DROP FUNCTION IF EXISTS Reserved_no_overlap;",
+               "DROP FUNCTION Apartment_Stats_on_apartment;",
+               "DROP FUNCTION Apartment_Stats_on_reviewed;",
+               "DROP FUNCTION Apartment_Stats_on_reserved;",
+               "DROP FUNCTION Rating_Ratios_on_reviewed;",
+               "DROP FUNCTION Monthly_Revenue_on_reserved;",
+               "DROP FUNCTION Owner_Stats_on_owner;",
+               "DROP FUNCTION Locations_on_apartment;",
+               "DROP FUNCTION Owns_on_apartment_delete;",
+               "DROP FUNCTION Owner_Stats_on_owns;",
+               "DROP TABLE Owner;",
                "DROP TABLE Apartment;",
                "DROP TABLE Customer;",
                "DROP TABLE Owns;",
                "DROP TABLE Reserved;",
                "DROP TABLE Reviewed;",
+               "DROP TABLE Apartment_Stats;",
+               "DROP TABLE Rating_Ratio_Stats;",
+               "DROP TABLE Monthly_Revenue;",
+               "DROP TABLE Locations;",
+               "DROP TABLE Owner_Locations;",
+               "DROP TABLE Owner_Stats;",
                "DROP VIEW Apartment_rating;",
                "DROP VIEW Customer_reservations;",
                "DROP VIEW Apartment_Average_price_per_night;",
@@ -82,8 +519,9 @@ def drop_tables():
     conn = None
     try:
         conn = Connector.DBConnector()
-        for query in queries:
-            conn.execute(query)
+        conn.execute_many(queries)
+        _reviews_written(conn, lambda engine: engine.clear())
+        _cache.clear()
 
     except Exception as e:
         print(e)
@@ -99,9 +537,8 @@ def add_owner(owner: Owner) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("INSERT INTO Owner VALUES({id}, {name})").format(id=sql.Literal(owner.get_owner_id()),
-                                                                         name=sql.Literal(owner.get_owner_name()))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["add_owner"],
+                                                 (owner.get_owner_id(), owner.get_owner_name()))
         if rows_affected != 1:
             return ReturnValue.ERROR
 
@@ -124,14 +561,19 @@ def get_owner(owner_id: int) -> Owner:
 
     if owner_id <= 0 or owner_id is None:
         return owner
+    row = _cache.get(("get_owner", owner_id))
+    if row is not None:
+        return Owner.from_row(row)
 
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("SELECT * FROM Owner WHERE Owner_ID = {id}").format(id=sql.Literal(owner_id))
-        _, result = conn.execute(query)
+        version = _cache.version()
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_owner"], (owner_id,))
         if result.size() == 1:
-            owner = Owner(**result[0])
+            row = result.rows[0]
+            owner = Owner.from_row(row)
+            _cache_row(conn, ("get_owner", owner_id), row, version)
     except Exception as e:
         print(e)
     finally:
@@ -145,10 +587,12 @@ def delete_owner(owner_id: int) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("DELETE FROM Owner WHERE Owner_ID = {id}").format(id=sql.Literal(owner_id))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["delete_owner"], (owner_id,))
         if rows_affected == 0:
             return ReturnValue.NOT_EXISTS
+        # the cascade removed the owner's Owns rows as well
+        _invalidate(conn, [("get_owner", owner_id)],
+                    where=lambda key, row: key[0] == "get_apartment_owner" and row[0] == owner_id)
     except Exception as e:
         print(e)
         return ReturnValue.ERROR
@@ -168,13 +612,9 @@ def add_apartment(apartment: Apartment) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("INSERT INTO Apartment VALUES({id}, {address}, {city}, {country}, {size})").format(
-            id=sql.Literal(apartment.get_id()),
-            address=sql.Literal(apartment.get_address()),
-            city=sql.Literal(apartment.get_city()),
-            country=sql.Literal(apartment.get_country()),
-            size=sql.Literal(apartment.get_size()))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["add_apartment"],
+                                                 (apartment.get_id(), apartment.get_address(), apartment.get_city(),
+                                                  apartment.get_country(), apartment.get_size()))
         if rows_affected != 1:
             return ReturnValue.ERROR
 
@@ -197,14 +637,19 @@ def get_apartment(apartment_id: int) -> Apartment:
 
     if apartment_id <= 0 or apartment_id is None:
         return apartment
+    row = _cache.get(("get_apartment", apartment_id))
+    if row is not None:
+        return Apartment.from_row(row)
 
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("SELECT * FROM Apartment WHERE ID = {id}").format(id=sql.Literal(apartment_id))
-        _, result = conn.execute(query)
+        version = _cache.version()
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_apartment"], (apartment_id,))
         if result.size() == 1:
-            apartment = Apartment(**result[0])
+            row = result.rows[0]
+            apartment = Apartment.from_row(row)
+            _cache_row(conn, ("get_apartment", apartment_id), row, version)
 
     except Exception as e:
         print(e)
@@ -219,10 +664,12 @@ def delete_apartment(apartment_id: int) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("DELETE FROM Apartment WHERE ID = {id}").format(id=sql.Literal(apartment_id))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["delete_apartment"], (apartment_id,))
         if rows_affected == 0:
             return ReturnValue.NOT_EXISTS
+        # the cascade removed the apartment's Owns row as well
+        _invalidate(conn, [("get_apartment", apartment_id), ("get_apartment_owner", apartment_id)])
+        _reviews_written(conn, lambda engine: engine.remove_apartment(apartment_id))
     except Exception as e:
         print(e)
         return ReturnValue.ERROR
@@ -239,10 +686,8 @@ def add_customer(customer: Customer) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("INSERT INTO Customer VALUES({id}, {name})").format(id=sql.Literal(customer.get_customer_id()),
-                                                                            name=sql.Literal(
-                                                                                customer.get_customer_name()))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["add_customer"],
+                                                 (customer.get_customer_id(), customer.get_customer_name()))
         if rows_affected != 1:
             return ReturnValue.ERROR
 
@@ -265,15 +710,20 @@ def get_customer(customer_id: int) -> Customer:
 
     if customer_id <= 0 or customer_id is None:
         return customer
+    row = _cache.get(("get_customer", customer_id))
+    if row is not None:
+        return Customer.from_row(row)
 
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("SELECT * FROM Customer WHERE Customer_ID = {id}").format(id=sql.Literal(customer_id))
-        _, result = conn.execute(query)
+        version = _cache.version()
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_customer"], (customer_id,))
 
         if result.size() == 1:
-            customer = Customer(**result[0])
+            row = result.rows[0]
+            customer = Customer.from_row(row)
+            _cache_row(conn, ("get_customer", customer_id), row, version)
 
     except Exception as e:
         print(e)
@@ -288,10 +738,11 @@ def delete_customer(customer_id: int) -> ReturnValue:
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("DELETE FROM Customer WHERE Customer_ID = {id}").format(id=sql.Literal(customer_id))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["delete_customer"], (customer_id,))
         if rows_affected == 0:
             return ReturnValue.NOT_EXISTS
+        _invalidate(conn, [("get_customer", customer_id)])
+        _reviews_written(conn, lambda engine: engine.remove_customer(customer_id))
     except Exception as e:
         print(e)
         return ReturnValue.ERROR
@@ -311,20 +762,15 @@ def customer_made_reservation(customer_id: int, apartment_id: int, start_date: d
     try:
         conn = Connector.DBConnector()
 
-        query = sql.SQL("INSERT INTO Reserved " +
-                        "SELECT {customer_id}, {apartment_id}, {start_date}, {end_date}, {total_price} " +
-                        "WHERE NOT EXISTS (SELECT 1 FROM Reserved AS R " +
-                        "WHERE R.id = {apartment_id} AND " +
-                        "(R.start_date, R.end_date) OVERLAPS ({start_date}, {end_date}))").format(
-            customer_id=sql.Literal(customer_id),
-            apartment_id=sql.Literal(apartment_id),
-            start_date=sql.Literal(start_date.strftime('%Y-%m-%d')),
-            end_date=sql.Literal(end_date.strftime('%Y-%m-%d')),
-            total_price=sql.Literal(total_price))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["customer_made_reservation"],
+                                                 (customer_id, apartment_id, start_date, end_date, total_price))
         if rows_affected == 0:
             return ReturnValue.BAD_PARAMS
 
+    except DatabaseException.EXCLUSION_VIOLATION as e:
+        # an overlapping reservation was committed concurrently, after the NOT EXISTS check
+        print(e)
+        return ReturnValue.BAD_PARAMS
     except DatabaseException.FOREIGN_KEY_VIOLATION as e:
         print(e)
         return ReturnValue.NOT_EXISTS
@@ -344,12 +790,8 @@ def customer_cancelled_reservation(customer_id: int, apartment_id: int, start_da
     conn = None
     try:
         conn = Connector.DBConnector()
-        query = sql.SQL("DELETE FROM Reserved WHERE " +
-                        "Customer_ID = {customer_id} AND ID = {apartment_id} AND start_date = {start_date}").format(
-                            customer_id=(sql.Literal(customer_id)),
-                            apartment_id=(sql.Literal(apartment_id)),
-                            start_date=sql.Literal(start_date.strftime('%Y-%m-%d')))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["customer_cancelled_reservation"],
+                                                 (customer_id, apartment_id, start_date))
         if rows_affected == 0:
             return ReturnValue.NOT_EXISTS
     except Exception as e:
@@ -370,20 +812,12 @@ def customer_reviewed_apartment(customer_id: int, apartment_id: int, review_date
     try:
         conn = Connector.DBConnector()
 
-        query = sql.SQL("INSERT INTO Reviewed " +
-                        "SELECT {apartment_id}, {customer_id}, {review_date}, {rating}, {review_text} " +
-                        "WHERE EXISTS (SELECT 1 FROM Reserved AS R " +
-                        "WHERE R.id = {apartment_id} AND R.Customer_ID = {customer_id} " +
-                        "AND R.end_date <= {review_date})").format(
-                            customer_id=sql.Literal(customer_id),
-                            apartment_id=sql.Literal(apartment_id),
-                            review_date=sql.Literal(review_date.strftime('%Y-%m-%d')),
-                            rating=sql.Literal(rating),
-                            review_text=sql.Literal(review_text))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["customer_reviewed_apartment"],
+                                                 (customer_id, apartment_id, review_date, rating, review_text))
         if rows_affected == 0:
             # where the reviewer didn't reserve the apartment on time
             return ReturnValue.NOT_EXISTS
+        _reviews_written(conn, lambda engine: engine.set_rating(customer_id, apartment_id, rating))
 
     except DatabaseException.FOREIGN_KEY_VIOLATION as e:
         # where customer or apartment not exist
@@ -412,18 +846,11 @@ def customer_updated_review(customer_id: int, apartment_id: int, update_date: da
     try:
         conn = Connector.DBConnector()
 
-        query = sql.SQL("UPDATE Reviewed " +
-                        "SET review_date = {update_date}, rating = {new_rating}, review_text = {new_text} " +
-                        "WHERE id = {apartment_id} AND Customer_ID = {customer_id} " +
-                        "AND review_date <= {update_date}").format(
-                            customer_id=sql.Literal(customer_id),
-                            apartment_id=sql.Literal(apartment_id),
-                            update_date=sql.Literal(update_date.strftime('%Y-%m-%d')),
-                            new_rating=sql.Literal(new_rating),
-                            new_text=sql.Literal(new_text))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["customer_updated_review"],
+                                                 (customer_id, apartment_id, update_date, new_rating, new_text))
         if rows_affected == 0:
             return ReturnValue.NOT_EXISTS
+        _reviews_written(conn, lambda engine: engine.set_rating(customer_id, apartment_id, new_rating))
     except Exception as e:
         print(e)
         return ReturnValue.ERROR
@@ -443,11 +870,8 @@ def owner_owns_apartment(owner_id: int, apartment_id: int) -> ReturnValue:
     try:
         conn = Connector.DBConnector()
 
-        query = sql.SQL("INSERT INTO Owns " +
-                        "SELECT {owner_id}, {apartment_id}").format(
-                            owner_id=sql.Literal(owner_id),
-                            apartment_id=sql.Literal(apartment_id))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["owner_owns_apartment"],
+                                                 (owner_id, apartment_id))
         if rows_affected == 0:
             return ReturnValue.ALREADY_EXISTS
 
@@ -475,13 +899,11 @@ def owner_drops_apartment(owner_id: int, apartment_id: int) -> ReturnValue:
     try:
         conn = Connector.DBConnector()
 
-        query = sql.SQL("DELETE FROM Owns " +
-                        "WHERE id = {apartment_id} AND Owner_id = {owner_id}").format(
-                        owner_id=sql.Literal(owner_id),
-                        apartment_id=sql.Literal(apartment_id))
-        rows_affected, _ = conn.execute(query)
+        rows_affected, _ = conn.execute_prepared(PREPARED_STATEMENTS["owner_drops_apartment"],
+                                                 (owner_id, apartment_id))
         if rows_affected == 0:
             return ReturnValue.NOT_EXISTS
+        _invalidate(conn, [("get_apartment_owner", apartment_id)])
 
     except Exception as e:
         print(e)
@@ -497,20 +919,21 @@ def get_apartment_owner(apartment_id: int) -> Owner:
 
     if apartment_id <= 0 or apartment_id is None:
         return returned_owner
+    row = _cache.get(("get_apartment_owner", apartment_id))
+    if row is not None:
+        return Owner.from_row(row)
 
     conn = None
     try:
         conn = Connector.DBConnector()
+        version = _cache.version()
 
-        query = sql.SQL("SELECT * FROM Owner O " +
-                        "WHERE EXISTS (SELECT 1 FROM Owns " +
-                        "WHERE id = {apartment_id} AND O.Owner_ID = Owner_ID)").format(
-                        apartment_id=sql.Literal(apartment_id))
-
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_apartment_owner"], (apartment_id,))
 
         if result.size() == 1:
-            returned_owner = Owner(**result[0])
+            row = result.rows[0]
+            returned_owner = Owner.from_row(row)
+            _cache_row(conn, ("get_apartment_owner", apartment_id), row, version)
 
     except Exception as e:
         print(e)
@@ -530,16 +953,11 @@ def get_owner_apartments(owner_id: int) -> List[Apartment]:
 
     conn = None
     try:
-        conn = Connector.DBConnector()
-
-        query = sql.SQL("SELECT * FROM Apartment AP " +
-                        "WHERE EXISTS (SELECT 1 FROM Owns " +
-                        "WHERE id = AP.id AND Owner_ID = {owner_id})").format(
-                        owner_id=sql.Literal(owner_id))
+        conn = Connector.DBConnector(read_only=True)
 
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_owner_apartments"], (owner_id,))
 
-        apartments_list = [Apartment(**apartment) for apartment in result]
+        apartments_list = [Apartment.from_row(row) for row in result.rows]
 
     except Exception as e:
         print(e)
@@ -549,6 +967,205 @@ def get_owner_apartments(owner_id: int) -> List[Apartment]:
     return apartments_list
 
 
+# ---------------------------------- BULK API: ----------------------------------
+
+# the bulk functions load a whole batch over one connection: the rows are streamed with COPY into a
+# temporary staging table and moved into the real table with a single INSERT ... SELECT.
+# they return one ReturnValue per input row, in input order, meaning the same as the single row function
+# would have returned had it been called for each row in turn.
+
+def add_owners(owners: List[Owner]) -> List[ReturnValue]:
+    report = [ReturnValue.BAD_PARAMS if owner.get_owner_name() is None or owner.get_owner_id() is None
+              or owner.get_owner_id() <= 0 else None for owner in owners]
+    rows = [(owner.get_owner_id(), owner.get_owner_name()) for owner in owners]
+    return _bulk_insert("Owner", ["Owner_ID", "Owner_name"], ["Owner_ID"], rows, report)
+
+
+def add_apartments(apartments: List[Apartment]) -> List[ReturnValue]:
+    rows = [(apartment.get_id(), apartment.get_address(), apartment.get_city(), apartment.get_country(),
+             apartment.get_size()) for apartment in apartments]
+    report = [ReturnValue.BAD_PARAMS if None in row or row[0] <= 0 or row[4] <= 0 else None for row in rows]
+    return _bulk_insert("Apartment", ["ID", "Address", "City", "Country", "Size"], ["ID", "City", "Address"],
+                        rows, report)
+
+
+def add_customers(customers: List[Customer]) -> List[ReturnValue]:
+    report = [ReturnValue.BAD_PARAMS if customer.get_customer_name() is None or customer.get_customer_id() is None
+              or customer.get_customer_id() <= 0 else None for customer in customers]
+    rows = [(customer.get_customer_id(), customer.get_customer_name()) for customer in customers]
+    return _bulk_insert("Customer", ["Customer_ID", "Customer_name"], ["Customer_ID"], rows, report)
+
+
+# reservations are (customer_id, apartment_id, start_date, end_date, total_price) tuples,
+# the arguments of customer_made_reservation
+def add_reservations(reservations: Iterable[Tuple[int, int, date, date, float]]) -> List[ReturnValue]:
+    rows = list(reservations)
+    report = [ReturnValue.BAD_PARAMS if (customer_id is None or customer_id <= 0 or apartment_id is None
+                                         or apartment_id <= 0 or total_price is None or total_price <= 0
+                                         or start_date is None or end_date is None or end_date < start_date)
+              else None for customer_id, apartment_id, start_date, end_date, total_price in rows]
+
+    conn = None
+    try:
+        conn = Connector.DBConnector()
+        with conn.transaction():
+            # no reservation can be made by anyone else until the batch is committed
+            conn.execute("LOCK TABLE Reserved IN SHARE ROW EXCLUSIVE MODE")
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS Reserved_Staging (rn INTEGER, LIKE Reserved) " +
+                         "ON COMMIT DROP")
+            conn.execute("TRUNCATE Reserved_Staging")
+            conn.copy_from("Reserved_Staging", ["rn", "Customer_ID", "ID", "start_date", "end_date", "total_price"],
+                           ((rn,) + tuple(row) for rn, row in enumerate(rows) if report[rn] is None))
+            conn.execute("ANALYZE Reserved_Staging")
+            report = _load_reservations(conn, rows, report)
+
+    except Exception as e:
+        print(e)
+        report = [ReturnValue.ERROR if status is None else status for status in report]
+    finally:
+        conn.close()
+    return report
+
+
+# checks the staged reservations and moves the accepted ones into Reserved, filling in their report entries
+def _load_reservations(conn: Connector.DBConnector, rows: List[tuple],
+                       report: List[ReturnValue]) -> List[ReturnValue]:
+    # a row overlapping an existing reservation is BAD_PARAMS, a row of a missing customer or apartment NOT_EXISTS
+    _, result = conn.execute("SELECT rn, overlaps FROM (" +
+                             "SELECT S.rn, " +
+                             "EXISTS (SELECT 1 FROM Reserved R WHERE R.id = S.id AND " +
+                             "daterange(R.start_date, GREATEST(R.end_date, R.start_date + 1)) && " +
+                             "daterange(S.start_date, GREATEST(S.end_date, S.start_date + 1))) AS overlaps, " +
+                             "EXISTS (SELECT 1 FROM Customer C WHERE C.Customer_ID = S.Customer_ID) AND " +
+                             "EXISTS (SELECT 1 FROM Apartment A WHERE A.ID = S.ID) AS known " +
+                             "FROM Reserved_Staging S) F " +
+                             "WHERE overlaps OR NOT known")
+    report = list(report)
+    rejected = []
+    for row in result:
+        report[row["rn"]] = ReturnValue.BAD_PARAMS if row["overlaps"] else ReturnValue.NOT_EXISTS
+        rejected.append(row["rn"])
+
+    # a row overlapping an earlier accepted row of the batch is BAD_PARAMS as well
+    booked = {}
+    for rn, (_, apartment_id, start_date, end_date, _) in enumerate(rows):
+        if report[rn] is not None:
+            continue
+        if _book(booked.setdefault(apartment_id, ([], [])), start_date, end_date):
+            report[rn] = ReturnValue.OK
+        else:
+            report[rn] = ReturnValue.BAD_PARAMS
+            rejected.append(rn)
+
+    # the rejected row numbers are copied next to the staged rows, so the statement stays the same size
+    # however many rows were rejected
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS Reserved_Rejected (rn INTEGER PRIMARY KEY) ON COMMIT DROP")
+    conn.execute("TRUNCATE Reserved_Rejected")
+    conn.copy_from("Reserved_Rejected", ["rn"], ((rn,) for rn in rejected))
+    conn.execute("INSERT INTO Reserved " +
+                 "SELECT Customer_ID, ID, start_date, end_date, total_price FROM Reserved_Staging S " +
+                 "WHERE NOT EXISTS (SELECT 1 FROM Reserved_Rejected J WHERE J.rn = S.rn)")
+    return report
+
+
+# adds [start_date, end_date] to the reservations of one apartment, kept as sorted start dates and their end dates.
+# returns False (and adds nothing) if it overlaps one of them, by the same rules as SQL's OVERLAPS
+def _book(reservations: Tuple[List[date], List[date]], start_date: date, end_date: date) -> bool:
+    starts, ends = reservations
+    i = bisect.bisect_right(starts, start_date)
+    # the accepted reservations do not overlap, so only the neighbours can overlap the new one
+    if i > 0 and (starts[i - 1] == start_date or start_date < ends[i - 1]):
+        return False
+    if i < len(starts) and starts[i] < end_date:
+        return False
+    starts.insert(i, start_date)
+    ends.insert(i, end_date)
+    return True
+
+
+# copies the rows whose report entry is still None into table, skipping rows that violate a unique key.
+# a row is OK if a row with its key columns was inserted (the first such row of the batch), ALREADY_EXISTS otherwise
+def _bulk_insert(table: str, columns: List[str], key_columns: List[str], rows: List[tuple],
+                 report: List[ReturnValue]) -> List[ReturnValue]:
+    staging = table + "_Staging"
+    key_indexes = [columns.index(column) for column in key_columns]
+
+    conn = None
+    try:
+        conn = Connector.DBConnector()
+        with conn.transaction():
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS " + staging + " (rn INTEGER, LIKE " + table + ") " +
+                         "ON COMMIT DROP")
+            conn.execute("TRUNCATE " + staging)
+            conn.copy_from(staging, ["rn"] + columns,
+                           ((rn,) + tuple(row) for rn, row in enumerate(rows) if report[rn] is None))
+            _, result = conn.execute("INSERT INTO " + table + " " +
+                                     "SELECT " + ", ".join(columns) + " FROM " + staging + " ORDER BY rn " +
+                                     "ON CONFLICT DO NOTHING " +
+                                     "RETURNING " + ", ".join(key_columns))
+
+        inserted = Counter(tuple(row[column] for column in key_columns) for row in result)
+        for rn, row in enumerate(rows):
+            if report[rn] is not None:
+                continue
+            key = tuple(row[i] for i in key_indexes)
+            if inserted[key] > 0:
+                inserted[key] -= 1
+                report[rn] = ReturnValue.OK
+            else:
+                report[rn] = ReturnValue.ALREADY_EXISTS
+
+    except Exception as e:
+        print(e)
+        report = [ReturnValue.ERROR if status is None else status for status in report]
+    finally:
+        conn.close()
+    return report
+
+
+# the multi-get functions fetch any number of IDs with one query over one connection,
+# IDs found in the cache of the point lookups are not fetched at all.
+# they return one object per input ID, in input order, with the bad_* object where get_* would return it
+def get_owners(owner_ids: List[int]) -> List[Owner]:
+    return _get_many("get_owner", "get_owners", owner_ids, Owner, Owner.bad_owner)
+
+
+def get_apartments(apartment_ids: List[int]) -> List[Apartment]:
+    return _get_many("get_apartment", "get_apartments", apartment_ids, Apartment, Apartment.bad_apartment)
+
+
+def get_customers(customer_ids: List[int]) -> List[Customer]:
+    return _get_many("get_customer", "get_customers", customer_ids, Customer, Customer.bad_customer)
+
+
+# single - name of the point lookup, whose cache entries are shared
+# statement - name of the prepared statement fetching the rows whose first column is = ANY($1)
+def _get_many(single: str, statement: str, ids: List[int], business_class, bad) -> list:
+    rows = {}
+    missing = []
+    for key in ids:
+        if key is None or key <= 0 or key in rows:
+            continue
+        rows[key] = _cache.get((single, key))
+        if rows[key] is None:
+            missing.append(key)
+
+    if missing:
+        conn = None
+        try:
+            conn = Connector.DBConnector()
+            version = _cache.version()
+            _, result = conn.execute_prepared(PREPARED_STATEMENTS[statement], (missing,))
+            for row in result.rows:
+                rows[row[0]] = row
+                _cache_row(conn, (single, row[0]), row, version)
+        except Exception as e:
+            print(e)
+        finally:
+            conn.close()
+
+    return [bad() if rows.get(key) is None else business_class.from_row(rows[key]) for key in ids]
+
 
 # ---------------------------------- BASIC API: ----------------------------------
 
@@ -560,13 +1177,9 @@ def get_apartment_rating(apartment_id: int) -> float:
 
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = Connector.DBConnector(read_only=True)
 
-        query = sql.SQL("SELECT average_rating FROM Apartment_Rating " +
-                        "WHERE id = {apartment_id}").format(
-                        apartment_id=sql.Literal(apartment_id))
-
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_apartment_rating"], (apartment_id,))
 
         if result.size() == 1:
             average = result[0]["average_rating"]
@@ -587,14 +1200,9 @@ def get_owner_rating(owner_id: int) -> float:
 
     conn = None
     try:
-        conn = Connector.DBConnector()
-
-        query = sql.SQL("SELECT COALESCE(AVG(average_rating),0) AS owner_rating FROM Apartment_Rating AR " +
-                        "WHERE EXISTS (SELECT 1 FROM Owns " +
-                        "WHERE id = AR.id AND owner_id = {owner_id})").format(
-                        owner_id=sql.Literal(owner_id))
+        conn = Connector.DBConnector(read_only=True)
 
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_owner_rating"], (owner_id,))
 
         if result.size() == 1:
             average = result[0]["owner_rating"]
@@ -612,17 +1220,11 @@ def get_top_customer() -> Customer:
 
     conn = None
     try:
-        conn = Connector.DBConnector()
-
-        query = sql.SQL("SELECT Customer_id, Customer_name " +
-                        "FROM Customer_reservations " +
-                        "WHERE num_reservations = (SELECT MAX(num_reservations) FROM Customer_reservations) " +
-                        "ORDER BY Customer_id " +
-                        "LIMIT 1;").format()
+        conn = Connector.DBConnector(read_only=True)
 
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_top_customer"])
         if result.size() == 1:
-            customer = Customer(**result[0])
+            customer = Customer.from_row(result.rows[0])
 
     except Exception as e:
         print(e)
@@ -636,16 +1238,10 @@ def reservations_per_owner() -> List[Tuple[str, int]]:
     result_list = []
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = Connector.DBConnector(read_only=True)
 
         # total number of reservations to apartments of each owner
-        query = sql.SQL("SELECT O.Owner_id, Owner_name, COUNT(R.start_date) AS num_reservations " +
-                        "FROM Owner O " +
-                        "LEFT OUTER JOIN Owns A ON O.Owner_id = A.Owner_id " +
-                        "LEFT OUTER JOIN Reserved R ON A.ID = R.ID " +
-                        "GROUP BY O.Owner_id, Owner_name;").format()
-
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["reservations_per_owner"])
 
         if result.size() < 1:
             return result_list
@@ -674,17 +1270,11 @@ def get_all_location_owners() -> List[Owner]:
 
     conn = None
     try:
-        conn = Connector.DBConnector()
-
-        query = sql.SQL("SELECT Owner_id, Owner_name " +
-                        "FROM Owner_cities_count " +
-                        "WHERE num_cities = " +
-                        "(SELECT COUNT(DISTINCT (City, Country)) " +
-                        "FROM Apartment);").format()
+        conn = Connector.DBConnector(read_only=True)
 
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_all_location_owners"])
         if result.size() > 0:
-            owners_list = [Owner(**owner) for owner in result]
+            owners_list = [Owner.from_row(row) for row in result.rows]
 
     except Exception as e:
         print(e)
@@ -708,18 +1298,12 @@ def best_value_for_money() -> Apartment:
 
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = Connector.DBConnector(read_only=True)
 
-        query = sql.SQL("SELECT A.ID, Address, City, Country, Size " +
-                        "FROM Apartment A JOIN Apartment_VFM_scores S ON A.ID = S.ID " +
-                        "WHERE score = (SELECT MAX(score) FROM Apartment_VFM_scores) " +
-                        "ORDER BY A.ID " +
-                        "LIMIT 1;").format()
-
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["best_value_for_money"])
 
         if result.size() == 1:
-            apartment = Apartment(**result[0])
+            apartment = Apartment.from_row(result.rows[0])
 
     except Exception as e:
         print(e)
@@ -738,18 +1322,9 @@ def profit_per_month(year: int) -> List[Tuple[int, float]]:
     profit_list = []
     conn = None
     try:
-        conn = Connector.DBConnector()
-
-        query = sql.SQL("SELECT EXTRACT(MONTH FROM RS.end_date) AS month, SUM(total_price)*0.15 AS profit " +
-                        "FROM ("
-                        "(SELECT * FROM Reserved WHERE EXTRACT(YEAR FROM end_date) = {year}) " +
-                        "UNION " +
-                        "(SELECT 0 AS Customer_id, 0 AS ID, DATE('{year}-01-01') AS start_date, generate_series(DATE('{year}-01-01'), DATE('{year}-12-01'), '1 month') AS end_date, 0 AS total_price)" +
-                        ") RS " +
-                        "GROUP BY EXTRACT(MONTH FROM RS.end_date) "
-                        "ORDER BY EXTRACT(MONTH FROM RS.end_date)").format(year=sql.Literal(year))
+        conn = Connector.DBConnector(read_only=True)
 
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["profit_per_month"], (year,))
 
         if result.size() >= 1:
             for row in result:
@@ -764,6 +1339,27 @@ def profit_per_month(year: int) -> List[Tuple[int, float]]:
     return profit_list
 
 
+# profit per month of every year from start_year to end_year (inclusive), as (year, month, profit) tuples
+# ordered by year and month, including the months where no profit was made
+def profit_per_month_range(start_year: int, end_year: int) -> List[Tuple[int, int, float]]:
+    profit_list = []
+    if start_year is None or end_year is None or start_year > end_year:
+        return profit_list
+
+    conn = None
+    try:
+        conn = Connector.DBConnector(read_only=True)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["profit_per_month_range"], (start_year, end_year))
+        profit_list = result.rows
+
+    except Exception as e:
+        print(e)
+
+    finally:
+        conn.close()
+    return profit_list
+
+
 
 
 
@@ -795,27 +1391,20 @@ def get_apartment_recommendation(customer_id: int) -> List[Tuple[Apartment, floa
     # group by: apartment
     # and average the approximations for each cid2-given information (each of which we make sure is between 1 and 10)
 
+    engine = _recommendation_engine
+    if engine is not None:
+        return _engine_recommendation(engine, customer_id)
+
     result_list = []
     conn = None
     try:
-        conn = Connector.DBConnector()
+        conn = Connector.DBConnector(read_only=True)
 
-        query = sql.SQL("SELECT A.ID AS ID, Address, City, Country, Size, " +
-                        "AVG(GREATEST(LEAST(RR.ratio * RE.rating, 10), 1)) AS approx " +
-                        "FROM Apartment A " +
-                        "JOIN Reviewed RE ON A.ID = RE.ID " +
-                        "JOIN Rating_Ratios RR ON RR.cid2 = RE.Customer_id " +
-                        "WHERE RR.cid1 = {Customer_id} " +
-                        "AND NOT EXISTS (SELECT * FROM Reviewed WHERE ID = A.ID AND Customer_id = {Customer_id}) " +
-                        "GROUP BY A.ID, Address, City, Country, Size " +
-                        "ORDER BY A.ID").format(Customer_id=sql.Literal(customer_id))
-
-        _, result = conn.execute(query)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_apartment_recommendation"], (customer_id,))
 
         if result.size() >= 1:
-            for row in result:
-                result_list.append(
-                    (Apartment(row["ID"], row["Address"], row["City"], row["Country"], row["Size"]), float(row["approx"])))
+            # rows are (ID, Address, City, Country, Size, approx)
+            result_list = [(Apartment.from_row(row), float(row[5])) for row in result.rows]
 
     except Exception as e:
         print(e)
@@ -825,19 +1414,72 @@ def get_apartment_recommendation(customer_id: int) -> List[Tuple[Apartment, floa
     return result_list
 
 
+# serve get_apartment_recommendation from an in-process RecommendationEngine (needs numpy and scipy).
+# the engine loads Reviewed now and then follows the review writes this process makes through this module
+def enable_recommendation_engine() -> None:
+    global _recommendation_engine
+    engine = RecommendationEngine()
+    engine.load()
+    _recommendation_engine = engine
+
+
+def disable_recommendation_engine() -> None:
+    global _recommendation_engine
+    _recommendation_engine = None
+
+
+def _engine_recommendation(engine: RecommendationEngine, customer_id: int) -> List[Tuple[Apartment, float]]:
+    result_list = []
+    conn = None
+    try:
+        # a stale engine reloads on a connection of its own, so it runs before this one is checked out
+        approximations = engine.approximations(customer_id)
+        conn = Connector.DBConnector(read_only=True)
+        _, result = conn.execute_prepared(PREPARED_STATEMENTS["get_apartments"],
+                                          ([apartment_id for apartment_id, _ in approximations],))
+        apartments = {row[0]: Apartment.from_row(row) for row in result.rows}
+        result_list = [(apartments[apartment_id], approx) for apartment_id, approx in approximations
+                       if apartment_id in apartments]
+
+    except Exception as e:
+        print(e)
+
+    finally:
+        if conn is not None:
+            conn.close()
+    return result_list
+
+
+# tells the recommendation engine, if enabled, about a review write made on conn.
+# a write inside a transaction() scope may still be rolled back, so the engine reloads instead
+def _reviews_written(conn: Connector.DBConnector, update) -> None:
+    engine = _recommendation_engine
+    if engine is None:
+        return
+    if conn.in_transaction():
+        engine.invalidate()
+    else:
+        update(engine)
+
+
 # print table for debugging purposes.
+# the rows are streamed from the server, so this works for tables of any size
 def get_table(query_string) -> None:
     conn = Connector.DBConnector()
-    query = sql.SQL(query_string).format()
-    _, result = conn.execute(query)
-    if result.size() < 1:
-        print("result given to get_table is none")
-        return
-    for field in result[0]:
-        print(field, end=" - ")
-    print()
-    for row in result:
-        for field in row:
-            print(row[field], end=' | ')
-        print()
+    try:
+        query = sql.SQL(query_string).format()
+        empty = True
+        for row in conn.stream(query):
+            if empty:
+                for field in row:
+                    print(field, end=" - ")
+                print()
+                empty = False
+            for field in row:
+                print(row[field], end=' | ')
+            print()
+        if empty:
+            print("result given to get_table is none")
+    finally:
+        conn.close()
     return
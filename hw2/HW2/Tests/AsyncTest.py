@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+import Utility.DBConnector as Connector
+from Utility.AsyncDBConnector import AsyncDBConnector
+from Tests.AbstractTest import AbstractTest
+
+MAX_SIZE = 2
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        super().setUp()
+        Connector.DBConnector.configure_pool(max_size=MAX_SIZE, checkout_timeout=5.0)
+        AsyncDBConnector.configure_executor(MAX_SIZE)
+
+    def tearDown(self) -> None:
+        Connector.DBConnector.configure_pool()
+        AsyncDBConnector.configure_executor(Connector.DBConnector.pool().max_size)
+        super().tearDown()
+
+    # more sessions than connections, each holding its connection across awaits: the ones beyond the pool wait
+    # on the event loop and the ones holding a connection still get threads to run on
+    def test_more_sessions_than_connections(self) -> None:
+        async def session(i):
+            async with await AsyncDBConnector.connect() as conn:
+                await asyncio.sleep(0.05)
+                _, result = await conn.execute("SELECT %d AS i" % i)
+                return result[0]["i"]
+
+        async def sessions():
+            return await asyncio.gather(*[session(i) for i in range(2 * MAX_SIZE)])
+
+        self.assertEqual(list(range(2 * MAX_SIZE)), asyncio.run(sessions()))
+        self.assertEqual(0, Connector.DBConnector.pool().in_use())
+
+    # a task cancelled during connect() does not keep the connection it was checking out
+    def test_cancelled_connect(self) -> None:
+        async def cancel_then_connect():
+            for _ in range(3 * MAX_SIZE):
+                task = asyncio.ensure_future(AsyncDBConnector.connect())
+                await asyncio.sleep(0)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+            # every permit is back only once the abandoned connections were returned
+            async def select_one():
+                async with await AsyncDBConnector.connect() as conn:
+                    return (await conn.execute("SELECT 1"))[0]
+            return await asyncio.gather(*[select_one() for _ in range(MAX_SIZE)])
+
+        self.assertEqual([1] * MAX_SIZE, asyncio.run(cancel_then_connect()))
+        self.assertEqual(0, Connector.DBConnector.pool().in_use())
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
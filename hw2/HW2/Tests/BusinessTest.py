@@ -0,0 +1,33 @@
+import unittest
+
+from Business.Apartment import Apartment
+from Business.Owner import Owner
+from Business.Customer import Customer
+
+'''
+    Business classes tests, these do not need a database
+'''
+
+
+class Test(unittest.TestCase):
+    def test_from_row(self) -> None:
+        apartment = Apartment.from_row((1, 'very address', 'much city', 'much state', 1000))
+        self.assertEqual(Apartment(1, 'very address', 'much city', 'much state', 1000), apartment)
+        self.assertEqual(1000, apartment.get_size())
+        self.assertEqual(Owner(1, 'very owner'), Owner.from_row((1, 'very owner')))
+        self.assertEqual(Customer(1, 'much customer'), Customer.from_row((1, 'much customer')))
+
+    def test_hash(self) -> None:
+        # equal objects hash alike, size is not compared so it is not hashed either
+        self.assertEqual(1, len({Apartment(1, 'a', 'c', 'co', 10), Apartment(1, 'a', 'c', 'co', 20)}))
+        self.assertEqual(2, len({Owner(1, 'o'), Owner(2, 'o'), Owner(1, 'o')}))
+        self.assertNotEqual(Owner(1, 'o'), Customer(1, 'o'))
+
+    def test_no_instance_dict(self) -> None:
+        with self.assertRaises(AttributeError):
+            Customer(1, 'c').nickname = 'x'
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
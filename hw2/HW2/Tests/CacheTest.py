@@ -0,0 +1,56 @@
+import time
+import unittest
+
+from Utility.Cache import LRUCache
+
+'''
+    LRUCache tests, these do not need a database
+'''
+
+class Test(unittest.TestCase):
+    def test_lru_eviction(self) -> None:
+        cache = LRUCache(max_size=2, ttl=None)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        cache.put("c", 3)  # "b" is the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+        self.assertEqual({"hits": 3, "misses": 1, "evictions": 1, "size": 2}, cache.stats())
+
+    def test_ttl(self) -> None:
+        cache = LRUCache(max_size=10, ttl=0.05)
+        cache.put("a", 1)
+        self.assertEqual(1, cache.get("a"))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(0, len(cache))
+
+    def test_invalidation(self) -> None:
+        cache = LRUCache(max_size=10, ttl=None)
+        for i in range(5):
+            cache.put(("owner", i), {"owner_id": i})
+        cache.invalidate(("owner", 0))
+        cache.invalidate_where(lambda key, row: row["owner_id"] % 2 == 1)
+        self.assertEqual([None, None, {"owner_id": 2}, None, {"owner_id": 4}],
+                         [cache.get(("owner", i)) for i in range(5)])
+
+    def test_stale_put_is_dropped(self) -> None:
+        cache = LRUCache(max_size=10, ttl=None)
+        version = cache.version()
+        cache.invalidate("a")  # a write happened after the value was read
+        cache.put("a", "old", version)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "new", cache.version())
+        self.assertEqual("new", cache.get("a"))
+
+    def test_disabled(self) -> None:
+        cache = LRUCache(max_size=0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,47 @@
+import unittest
+from datetime import date, timedelta
+
+import Solution as Solution
+from Utility.ReturnValue import ReturnValue
+from Utility.SolutionExecutor import SolutionExecutor
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+
+THREADS = 8
+STAYS = 28  # stay k covers the nights of days k and k + 1 of January 2020, so stays k and k + 1 overlap
+
+
+class Test(AbstractTest):
+    # every thread tries to book every stay of the same apartment, the constraint must keep the booked stays apart
+    def test_no_double_booking(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.add_apartment(Apartment(1, 'address', 'city', 'country', 50)))
+        for i in range(1, THREADS + 1):
+            self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(i, 'customer %d' % i)))
+
+        def book_all(customer_id):
+            statuses = []
+            for k in range(STAYS):
+                start_date = date(2020, 1, 1) + timedelta(days=k)
+                statuses.append(Solution.customer_made_reservation(customer_id, 1, start_date,
+                                                                   start_date + timedelta(days=2), 100))
+            return statuses
+
+        with SolutionExecutor(max_workers=THREADS) as executor:
+            results = executor.map(book_all, range(1, THREADS + 1))
+
+        for statuses in results:
+            self.assertTrue(all(status in (ReturnValue.OK, ReturnValue.BAD_PARAMS) for status in statuses))
+        booked = [k for k in range(STAYS) if any(statuses[k] == ReturnValue.OK for statuses in results)]
+        for k in range(STAYS):
+            self.assertLessEqual(sum(statuses[k] == ReturnValue.OK for statuses in results), 1)
+        # booked stays do not overlap, and a stay was only refused because an overlapping one was booked
+        self.assertTrue(all(second - first >= 2 for first, second in zip(booked, booked[1:])))
+        self.assertTrue(all(k in booked or k - 1 in booked or k + 1 in booked for k in range(STAYS)))
+        self.assertAlmostEqual(0.15 * 100 * len(booked), Solution.profit_per_month(2020)[0][1])
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
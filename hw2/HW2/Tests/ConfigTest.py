@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from Utility.DBConnector import DBConnector
+
+'''
+    database.ini parsing tests, these do not need a database
+'''
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.directory.name, "Utility"))
+        os.chdir(self.directory.name)
+
+    def tearDown(self) -> None:
+        os.environ.pop("DATABASE_URL", None)
+        os.environ.pop("DATABASE_REPLICA_URLS", None)
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+        DBConnector.reload_config()
+
+    def write_ini(self, text: str, modified: int) -> None:
+        path = os.path.join(self.directory.name, "Utility", "database.ini")
+        with open(path, "w") as f:
+            f.write(text)
+        os.utime(path, ns=(modified, modified))
+
+    def test_parsed_once_until_reloaded(self) -> None:
+        self.write_ini("[postgresql]\ndatabase=first\nhost=primary\n[replica1]\nhost=replica\n", 1_000_000_000)
+        DBConnector.reload_config()
+        self.assertEqual({"database": "first", "host": "primary"}, DBConnector.config())
+        self.assertEqual([{"database": "first", "host": "replica"}], DBConnector.replica_configs())
+
+        self.write_ini("[postgresql]\ndatabase=second\n", 2_000_000_000)
+        self.assertEqual("first", DBConnector.config()["database"])
+        DBConnector.reload_config()
+        self.assertEqual("second", DBConnector.config()["database"])
+        self.assertEqual([], DBConnector.replica_configs())
+
+    def test_environment_overrides(self) -> None:
+        self.write_ini("[postgresql]\ndatabase=first\n[replica]\nhost=replica\n", 1_000_000_000)
+        DBConnector.reload_config()
+        os.environ["DATABASE_URL"] = "postgresql://user@primary/hw2"
+        os.environ["DATABASE_REPLICA_URLS"] = "postgresql://user@replica1/hw2 postgresql://user@replica2/hw2"
+        self.assertEqual({"dsn": "postgresql://user@primary/hw2"}, DBConnector.config())
+        self.assertEqual([{"dsn": "postgresql://user@replica1/hw2"}, {"dsn": "postgresql://user@replica2/hw2"}],
+                         DBConnector.replica_configs())
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,35 @@
+import unittest
+import Solution as Solution
+import Utility.DBConnector as Connector
+from Utility.Exceptions import DatabaseException
+from Tests.AbstractTest import AbstractTest
+
+
+class Test(AbstractTest):
+    def test_rowcounts_and_savepoints(self) -> None:
+        add_owner = Solution.PREPARED_STATEMENTS["add_owner"]
+        conn = Connector.DBConnector()
+        try:
+            self.assertEqual([1, 1, 2], conn.execute_many([(add_owner, (1, 'owner 1')),
+                                                           "INSERT INTO Owner VALUES(2, 'owner 2')",
+                                                           "UPDATE Owner SET Owner_name = 'renamed'"]))
+
+            # the duplicate is undone alone
+            results = conn.execute_many([(add_owner, (3, 'owner 3')), (add_owner, (1, 'again')),
+                                         (add_owner, (4, 'owner 4'))], savepoints=True)
+            self.assertEqual(1, results[0])
+            self.assertIsInstance(results[1], DatabaseException.UNIQUE_VIOLATION)
+            self.assertEqual(1, results[2])
+
+            # without savepoints the whole batch is undone
+            with self.assertRaises(DatabaseException.CHECK_VIOLATION):
+                conn.execute_many([(add_owner, (5, 'owner 5')), (add_owner, (-1, 'bad id'))])
+            _, result = conn.execute("SELECT Owner_ID FROM Owner ORDER BY Owner_ID")
+            self.assertEqual([1, 2, 3, 4], result["Owner_ID"])
+        finally:
+            conn.close()
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,67 @@
+import re
+import unittest
+from datetime import date
+
+from psycopg2 import sql
+
+import Solution as Solution
+import Utility.DBConnector as Connector
+from Tests.AbstractTest import AbstractTest
+
+'''
+    every point access of Solution.py must be served by an index.
+    with sequential scans disabled the planner still picks one when no index fits,
+    so a Seq Scan in the plan means an index is missing
+'''
+
+# prepared statement -> arguments to plan it with
+ACCESS_PATHS = {
+    "get_owner": (1,),
+    "delete_owner": (1,),
+    "get_apartment": (1,),
+    "get_apartments": ([1, 2],),
+    "delete_apartment": (1,),
+    "get_customer": (1,),
+    "delete_customer": (1,),
+    "customer_made_reservation": (1, 1, date(2020, 1, 1), date(2020, 1, 5), 100.0),
+    "customer_cancelled_reservation": (1, 1, date(2020, 1, 1)),
+    "customer_reviewed_apartment": (1, 1, date(2020, 2, 1), 5, "review"),
+    "customer_updated_review": (1, 1, date(2020, 3, 1), 6, "review"),
+    "owner_drops_apartment": (1, 1),
+    "get_apartment_owner": (1,),
+    "get_owner_apartments": (1,),
+    "get_apartment_rating": (1,),
+    "get_owner_rating": (1,),
+    "profit_per_month": (2020,),
+    "get_apartment_recommendation": (1,),
+}
+
+
+class Test(AbstractTest):
+    # the plan of a prepared statement's query, with its parameters inlined as typed literals
+    @staticmethod
+    def plan(conn: Connector.DBConnector, statement: Connector.PreparedStatement, args: tuple) -> str:
+        def parameter(match):
+            i = int(match.group(1)) - 1
+            return "{" + str(i) + "}::" + statement.arg_types[i]
+
+        template = re.sub(r"\$(\d+)", parameter, statement.query.replace("{", "{{").replace("}", "}}"))
+        query = sql.SQL("EXPLAIN " + template).format(*[sql.Literal(arg) for arg in args])
+        _, result = conn.execute(query)
+        return "\n".join(line for line, in result.rows)
+
+    def test_access_paths_use_indexes(self) -> None:
+        conn = Connector.DBConnector()
+        try:
+            with conn.transaction():
+                conn.execute("SET LOCAL enable_seqscan = off")
+                for name, args in ACCESS_PATHS.items():
+                    plan = self.plan(conn, Solution.PREPARED_STATEMENTS[name], args)
+                    self.assertNotIn("Seq Scan", plan, name + "\n" + plan)
+        finally:
+            conn.close()
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,43 @@
+import unittest
+
+import Utility.Metrics as Metrics
+from Utility.Metrics import QueryEvent, HistogramSink, CallbackSink
+
+'''
+    Metrics tests, these do not need a database
+'''
+
+
+class Test(unittest.TestCase):
+    def tearDown(self) -> None:
+        Metrics.clear_sinks()
+
+    def test_percentiles(self) -> None:
+        histogram = HistogramSink()
+        for ms in range(1, 101):
+            histogram.record(QueryEvent("get_owner", "get_owner", ms / 1000, 1, 0.0, None))
+        histogram.record(QueryEvent("get_owner", "get_owner", 0.001, 0, 0.0, "UNIQUE_VIOLATION"))
+        report = histogram.report()["get_owner"]
+        self.assertEqual(101, report["count"])
+        self.assertEqual({"UNIQUE_VIOLATION": 1}, report["errors"])
+        for q, expected in [("p50", 0.050), ("p95", 0.095), ("p99", 0.099)]:
+            self.assertAlmostEqual(expected, report[q], delta=expected * 0.03)
+
+    def test_emit(self) -> None:
+        events = []
+        Metrics.add_sink(CallbackSink(events.append))
+        Metrics.emit("get_owner", 0.002, 1, 0.001, None)
+        self.assertEqual(1, len(events))
+        self.assertEqual(("<unknown>", "get_owner", 1), (events[0].operation, events[0].query, events[0].rows))
+        Metrics.clear_sinks()
+        Metrics.emit("get_owner", 0.002, 1, 0.0, None)
+        self.assertEqual(1, len(events))
+
+    def test_query_shape(self) -> None:
+        self.assertEqual("SELECT * FROM Owner WHERE Owner_ID = ? AND Owner_name = ?",
+                         Metrics.query_shape("SELECT *  FROM Owner\nWHERE Owner_ID = 12 AND Owner_name = 'it''s'"))
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
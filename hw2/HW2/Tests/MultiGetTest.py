@@ -0,0 +1,32 @@
+import unittest
+import Solution as Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Owner import Owner
+from Business.Customer import Customer
+
+
+class Test(AbstractTest):
+    def test_input_order_and_placeholders(self) -> None:
+        owners = [Owner(i, 'owner %d' % i) for i in range(1, 4)]
+        self.assertEqual([ReturnValue.OK] * 3, Solution.add_owners(owners))
+        self.assertEqual([owners[2], Owner.bad_owner(), owners[0], owners[2], Owner.bad_owner()],
+                         Solution.get_owners([3, 7, 1, 3, -1]))
+
+        apartments = [Apartment(i, 'address %d' % i, 'city', 'country', 40 + i) for i in range(1, 4)]
+        self.assertEqual([ReturnValue.OK] * 3, Solution.add_apartments(apartments))
+        Solution.get_apartment(2)  # cached
+        self.assertEqual([apartments[1], apartments[0], Apartment.bad_apartment()],
+                         Solution.get_apartments([2, 1, 4]))
+
+        customers = [Customer(i, 'customer %d' % i) for i in range(1, 3)]
+        self.assertEqual([ReturnValue.OK] * 2, Solution.add_customers(customers))
+        self.assertEqual([], Solution.get_customers([]))
+        self.assertEqual(customers, Solution.get_customers([1, 2]))
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,51 @@
+import unittest
+from datetime import date
+
+import Solution as Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+from Business.Owner import Owner
+
+
+class Test(AbstractTest):
+    def test_stats_follow_ownership(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.add_owner(Owner(1, 'first')))
+        self.assertEqual(ReturnValue.OK, Solution.add_owner(Owner(2, 'second')))
+        self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(1, 'customer')))
+        self.assertEqual(ReturnValue.OK, Solution.add_apartment(Apartment(1, 'a1', 'Haifa', 'Israel', 50)))
+        self.assertEqual(ReturnValue.OK, Solution.add_apartment(Apartment(2, 'a2', 'Paris', 'France', 50)))
+        self.assertEqual(ReturnValue.OK, Solution.add_apartment(Apartment(3, 'a3', 'Haifa', 'Israel', 50)))
+        self.assertEqual(ReturnValue.NOT_EXISTS, Solution.owner_owns_apartment(1, 4))
+
+        # reservations made before the apartment is owned are counted when it becomes owned
+        self.assertEqual(ReturnValue.OK,
+                         Solution.customer_made_reservation(1, 1, date(2020, 1, 1), date(2020, 1, 3), 100))
+        self.assertEqual(ReturnValue.OK, Solution.owner_owns_apartment(1, 1))
+        self.assertEqual(ReturnValue.OK, Solution.owner_owns_apartment(1, 2))
+        self.assertEqual(ReturnValue.OK, Solution.owner_owns_apartment(2, 3))
+        self.assertEqual(ReturnValue.OK,
+                         Solution.customer_made_reservation(1, 2, date(2020, 1, 1), date(2020, 1, 3), 100))
+        self.assertEqual(ReturnValue.OK,
+                         Solution.customer_made_reservation(1, 3, date(2020, 2, 1), date(2020, 2, 3), 100))
+        self.assertEqual([('first', 2), ('second', 1)], sorted(Solution.reservations_per_owner()))
+        self.assertEqual([Owner(1, 'first')], Solution.get_all_location_owners())
+
+        # the second Haifa apartment keeps owner 2 in Haifa, its Paris apartment makes it an all-location owner
+        self.assertEqual(ReturnValue.OK, Solution.owner_drops_apartment(1, 2))
+        self.assertEqual(ReturnValue.OK, Solution.owner_owns_apartment(2, 2))
+        self.assertEqual([Owner(2, 'second')], Solution.get_all_location_owners())
+        self.assertEqual([('first', 1), ('second', 2)], sorted(Solution.reservations_per_owner()))
+
+        # deleting an apartment removes its reservations and its location
+        self.assertEqual(ReturnValue.OK, Solution.delete_apartment(2))
+        self.assertEqual([('first', 1), ('second', 1)], sorted(Solution.reservations_per_owner()))
+        self.assertEqual([Owner(1, 'first'), Owner(2, 'second')],
+                         sorted(Solution.get_all_location_owners(), key=Owner.get_owner_id))
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,63 @@
+import unittest
+from datetime import date
+
+import Solution as Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+
+
+class Test(AbstractTest):
+    # the tables are created by each test, after it chose the partitioning
+    def setUp(self) -> None:
+        pass
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        Solution.configure_partitioning(None)
+
+    def check_api(self, scheme: str) -> None:
+        Solution.configure_partitioning(scheme, partitions=4, first_year=2020, last_year=2021)
+        Solution.create_tables()
+        self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(1, 'first')))
+        self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(2, 'second')))
+        for i in range(1, 4):
+            self.assertEqual(ReturnValue.OK, Solution.add_apartment(Apartment(i, 'address %d' % i, 'city', 'c', 50)))
+
+        # a stay across the new year lands in the 2021 partition under "range", overlapping stays of other
+        # partitions are still refused
+        self.assertEqual(ReturnValue.OK,
+                         Solution.customer_made_reservation(1, 1, date(2020, 12, 30), date(2021, 1, 2), 300))
+        self.assertEqual(ReturnValue.BAD_PARAMS,
+                         Solution.customer_made_reservation(2, 1, date(2020, 12, 25), date(2020, 12, 31), 100))
+        self.assertEqual(ReturnValue.OK,
+                         Solution.customer_made_reservation(2, 1, date(2020, 12, 25), date(2020, 12, 30), 100))
+        self.assertEqual(ReturnValue.OK,
+                         Solution.customer_made_reservation(2, 2, date(2030, 1, 1), date(2030, 1, 2), 100))
+        self.assertEqual([ReturnValue.OK, ReturnValue.BAD_PARAMS],
+                         Solution.add_reservations([(1, 3, date(2020, 5, 1), date(2020, 5, 3), 100),
+                                                    (2, 3, date(2020, 5, 2), date(2020, 5, 4), 100)]))
+
+        self.assertEqual(ReturnValue.OK, Solution.customer_reviewed_apartment(1, 1, date(2021, 1, 3), 8, 'good'))
+        self.assertEqual(ReturnValue.OK, Solution.customer_reviewed_apartment(2, 1, date(2021, 1, 3), 4, 'bad'))
+        self.assertEqual(ReturnValue.OK, Solution.customer_updated_review(2, 1, date(2021, 1, 4), 6, 'fine'))
+        self.assertAlmostEqual(7.0, Solution.get_apartment_rating(1))
+        self.assertAlmostEqual(0.15 * 300, Solution.profit_per_month(2021)[0][1])
+        self.assertEqual(ReturnValue.OK, Solution.customer_cancelled_reservation(2, 2, date(2030, 1, 1)))
+
+        self.assertEqual(ReturnValue.OK, Solution.delete_customer(1))
+        self.assertEqual(0.0, Solution.profit_per_month(2021)[0][1])
+        self.assertAlmostEqual(6.0, Solution.get_apartment_rating(1))
+
+    def test_hash(self) -> None:
+        self.check_api("hash")
+
+    def test_range(self) -> None:
+        self.check_api("range")
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,40 @@
+import gc
+import os
+import unittest
+
+import Solution as Solution
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Customer import Customer
+
+
+class Test(AbstractTest):
+    # a forked child uses the pool and drops the connections it inherited, the parent's stay usable
+    def test_fork(self) -> None:
+        conn = Connector.DBConnector()
+        try:
+            conn.execute("SELECT 1")
+            pid = os.fork()
+            if pid == 0:
+                status = 1
+                try:
+                    conn.close()
+                    conn = None
+                    gc.collect()
+                    if Solution.add_customer(Customer(1, 'child')) == ReturnValue.OK:
+                        status = 0
+                finally:
+                    os._exit(status)
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(0, status)
+            self.assertEqual(1, conn.execute("SELECT 1")[0])
+        finally:
+            conn.close()
+        self.assertEqual(Customer(1, 'child'), Solution.get_customer(1))
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
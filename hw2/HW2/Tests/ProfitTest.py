@@ -0,0 +1,58 @@
+import unittest
+from datetime import date
+
+import Solution as Solution
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+
+
+class Test(AbstractTest):
+    def test_ledger_follows_reservations(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(1, 'customer')))
+        self.assertEqual(ReturnValue.OK, Solution.add_apartment(Apartment(1, 'address', 'city', 'country', 50)))
+        for start, end, price in [(date(2020, 1, 1), date(2020, 1, 3), 100),
+                                  (date(2020, 1, 10), date(2020, 1, 12), 300),
+                                  (date(2020, 3, 30), date(2020, 4, 2), 200),
+                                  (date(2021, 1, 1), date(2021, 1, 5), 50)]:
+            self.assertEqual(ReturnValue.OK, Solution.customer_made_reservation(1, 1, start, end, price))
+        self.assertEqual(ReturnValue.OK, Solution.customer_cancelled_reservation(1, 1, date(2020, 1, 10)))
+
+        expected = [(month, 0.0) for month in range(1, 13)]
+        expected[0] = (1, 15.0)
+        expected[3] = (4, 30.0)
+        self.assertEqual(expected, [(month, round(profit, 6)) for month, profit in Solution.profit_per_month(2020)])
+
+        months = Solution.profit_per_month_range(2019, 2021)
+        self.assertEqual(36, len(months))
+        self.assertEqual([(2020, 1), (2020, 4), (2021, 1)],
+                         [(year, month) for year, month, profit in months if profit != 0])
+
+        # deleting the apartment cascades to its reservations
+        self.assertEqual(ReturnValue.OK, Solution.delete_apartment(1))
+        self.assertEqual([0.0] * 12, [profit for _, profit in Solution.profit_per_month(2020)])
+
+    # apartments of different shards booked in the same month, added at once and one by one
+    def test_shards_summed(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(1, 'customer')))
+        apartment_ids = [1, 2, 1 + Solution.REVENUE_SHARDS]
+        for apartment_id in apartment_ids:
+            self.assertEqual(ReturnValue.OK, Solution.add_apartment(
+                Apartment(apartment_id, 'address %d' % apartment_id, 'city', 'country', 50)))
+        self.assertEqual([ReturnValue.OK] * 3,
+                         Solution.add_reservations([(1, apartment_id, date(2020, 5, 1), date(2020, 5, 3), 100)
+                                                    for apartment_id in apartment_ids]))
+        self.assertEqual(ReturnValue.OK,
+                         Solution.customer_made_reservation(1, 2, date(2020, 5, 10), date(2020, 5, 12), 100))
+        self.assertAlmostEqual(60.0, Solution.profit_per_month(2020)[4][1])
+        self.assertAlmostEqual(60.0, Solution.profit_per_month_range(2020, 2020)[4][2])
+
+        self.assertEqual(ReturnValue.OK, Solution.customer_cancelled_reservation(1, 1, date(2020, 5, 1)))
+        self.assertAlmostEqual(45.0, Solution.profit_per_month(2020)[4][1])
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,61 @@
+import unittest
+from datetime import date
+
+import Solution as Solution
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+
+
+class Test(AbstractTest):
+    @staticmethod
+    def pairs() -> list:
+        conn = Connector.DBConnector()
+        try:
+            _, result = conn.execute("SELECT cid1, cid2, ratio_count FROM Rating_Ratio_Stats ORDER BY cid1, cid2")
+            return result.rows
+        finally:
+            conn.close()
+
+    def review(self, customer_id: int, apartment_id: int, rating: int) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.customer_made_reservation(customer_id, apartment_id,
+                                                                            date(2020, customer_id, apartment_id),
+                                                                            date(2020, customer_id, apartment_id + 1),
+                                                                            100))
+        self.assertEqual(ReturnValue.OK, Solution.customer_reviewed_apartment(customer_id, apartment_id,
+                                                                              date(2021, 1, 1), rating, 'review'))
+
+    # a pair goes away with the last apartment both customers reviewed
+    def test_pairs_removed(self) -> None:
+        for customer_id in range(1, 4):
+            self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(customer_id, 'customer')))
+        for apartment_id in range(1, 4):
+            self.assertEqual(ReturnValue.OK, Solution.add_apartment(
+                Apartment(apartment_id, 'address %d' % apartment_id, 'city', 'country', 50)))
+        self.review(1, 1, 4)
+        self.review(2, 1, 8)
+        self.review(1, 2, 5)
+        self.review(3, 2, 5)
+        self.assertEqual([(1, 2, 1), (1, 3, 1), (2, 1, 1), (3, 1, 1)], self.pairs())
+
+        self.assertEqual(ReturnValue.OK, Solution.customer_updated_review(2, 1, date(2021, 2, 1), 2, 'worse'))
+        self.assertEqual([(1, 2, 1), (1, 3, 1), (2, 1, 1), (3, 1, 1)], self.pairs())
+
+        self.assertEqual(ReturnValue.OK, Solution.delete_customer(2))
+        self.assertEqual([(1, 3, 1), (3, 1, 1)], self.pairs())
+        self.assertEqual(ReturnValue.OK, Solution.delete_apartment(2))
+        self.assertEqual([], self.pairs())
+
+        self.review(1, 3, 4)
+        self.review(3, 3, 6)
+        self.assertEqual([(1, 3, 1), (3, 1, 1)], self.pairs())
+        Solution.clear_tables()
+        self.assertEqual([], self.pairs())
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
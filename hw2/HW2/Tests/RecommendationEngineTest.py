@@ -0,0 +1,91 @@
+import unittest
+from datetime import date
+
+import Solution as Solution
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+
+try:
+    import numpy
+    import scipy
+except ImportError:
+    numpy = None
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        if numpy is None:
+            self.skipTest("the recommendation engine needs numpy and scipy, see requirements.txt")
+        super().setUp()
+
+    def tearDown(self) -> None:
+        Solution.disable_recommendation_engine()
+        super().tearDown()
+
+    def review(self, customer_id: int, apartment_id: int, rating: int) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.customer_made_reservation(customer_id, apartment_id,
+                                                                            date(2020, customer_id, apartment_id),
+                                                                            date(2020, customer_id, apartment_id + 1),
+                                                                            100))
+        self.assertEqual(ReturnValue.OK, Solution.customer_reviewed_apartment(customer_id, apartment_id,
+                                                                              date(2021, 1, 1), rating, 'review'))
+
+    def test_matches_sql(self) -> None:
+        for customer_id in range(1, 5):
+            self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(customer_id, 'customer')))
+        for apartment_id in range(1, 6):
+            self.assertEqual(ReturnValue.OK, Solution.add_apartment(
+                Apartment(apartment_id, 'address %d' % apartment_id, 'city', 'country', 50)))
+        self.review(1, 1, 4)
+
+        # the engine loads the first review and follows every write after it
+        Solution.enable_recommendation_engine()
+        for customer_id, apartment_id, rating in [(1, 2, 8), (2, 1, 2), (2, 3, 9), (2, 4, 5), (3, 2, 10),
+                                                  (3, 5, 3), (4, 5, 7)]:
+            self.review(customer_id, apartment_id, rating)
+        self.assertEqual(ReturnValue.OK, Solution.customer_updated_review(2, 1, date(2021, 2, 1), 6, 'better'))
+        self.assertEqual(ReturnValue.OK, Solution.delete_apartment(4))
+        engine_results = [Solution.get_apartment_recommendation(customer_id) for customer_id in range(1, 5)]
+
+        Solution.disable_recommendation_engine()
+        sql_results = [Solution.get_apartment_recommendation(customer_id) for customer_id in range(1, 5)]
+
+        for expected, actual in zip(sql_results, engine_results):
+            self.assertEqual([apartment.get_id() for apartment, _ in expected],
+                             [apartment.get_id() for apartment, _ in actual])
+            for (_, expected_approx), (_, actual_approx) in zip(expected, actual):
+                self.assertAlmostEqual(expected_approx, actual_approx)
+
+    # a review written inside a transaction() scope makes the engine reload, which needs no second connection
+    def test_reload_after_transaction(self) -> None:
+        for customer_id in range(1, 3):
+            self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(customer_id, 'customer')))
+        for apartment_id in range(1, 4):
+            self.assertEqual(ReturnValue.OK, Solution.add_apartment(
+                Apartment(apartment_id, 'address %d' % apartment_id, 'city', 'country', 50)))
+        self.review(1, 1, 4)
+        self.review(2, 1, 8)
+        Solution.enable_recommendation_engine()
+
+        Connector.DBConnector.configure_pool(max_size=1, checkout_timeout=5.0)
+        try:
+            conn = Connector.DBConnector()
+            try:
+                with conn.transaction():
+                    self.review(2, 2, 6)
+            finally:
+                conn.close()
+            recommendation = Solution.get_apartment_recommendation(1)
+        finally:
+            Connector.DBConnector.configure_pool()
+        self.assertEqual([2], [apartment.get_id() for apartment, _ in recommendation])
+        self.assertAlmostEqual(3.0, recommendation[0][1])
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+import unittest
+from datetime import date
+
+import AsyncSolution
+import Solution as Solution
+import Utility.DBConnector as Connector
+from Benchmarks.local_postgres import LocalPostgres
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Customer import Customer
+
+'''
+    read replica routing tests, the replica is a second local cluster started by LocalPostgres
+    (skipped when the PostgreSQL server binaries are not installed). it does not replicate, so which
+    server answered is told by the data: reservations are only made on the primary
+'''
+
+
+class Test(AbstractTest):
+    def setUp(self) -> None:
+        self.replica = LocalPostgres()
+        try:
+            params = self.replica.__enter__()
+        except Exception as e:
+            self.skipTest("no local PostgreSQL: %s" % e)
+        # the replica gets the schema through a primary pool pointing at it
+        Connector.DBConnector.configure_pool(params=params)
+        Solution.create_tables()
+        Connector.DBConnector.configure_pool()
+        Connector.DBConnector.configure_replicas([params], sticky_seconds=0.5)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        Connector.DBConnector.configure_replicas([])
+        self.replica.__exit__(None, None, None)
+
+    # the result of fn() called in a thread that never wrote
+    @staticmethod
+    def in_new_session(fn):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(fn()))
+        thread.start()
+        thread.join()
+        return results[0]
+
+    def test_routing(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(1, 'customer')))
+        self.assertEqual(ReturnValue.OK, Solution.add_apartment(Apartment(1, 'address', 'city', 'country', 50)))
+        self.assertEqual(ReturnValue.OK,
+                         Solution.customer_made_reservation(1, 1, date(2020, 1, 1), date(2020, 1, 3), 100))
+
+        # read your writes: this thread just wrote, so it reads the primary
+        self.assertAlmostEqual(15.0, Solution.profit_per_month(2020)[0][1])
+        # a session that did not write reads the replica
+        self.assertEqual(0.0, self.in_new_session(lambda: Solution.profit_per_month(2020)[0][1]))
+        # cached point lookups always read the primary
+        self.assertEqual(Customer(1, 'customer'), self.in_new_session(lambda: Solution.get_customer(1)))
+
+        time.sleep(0.5)
+        self.assertEqual(0.0, Solution.profit_per_month(2020)[0][1])
+
+        # replica sessions are read only
+        conn = Connector.DBConnector(read_only=True)
+        try:
+            self.assertTrue(conn.on_replica())
+            self.assertRaises(Exception, conn.execute, "INSERT INTO Customer VALUES(2, 'customer')")
+        finally:
+            conn.close()
+
+    # an async caller reads its own write, although the write and the read ran on executor threads
+    def test_async_routing(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.add_customer(Customer(1, 'customer')))
+        self.assertEqual(ReturnValue.OK, Solution.add_apartment(Apartment(1, 'address', 'city', 'country', 50)))
+
+        async def book_then_read():
+            self.assertEqual(ReturnValue.OK, await AsyncSolution.customer_made_reservation(
+                1, 1, date(2020, 1, 1), date(2020, 1, 3), 100))
+            return (await AsyncSolution.profit_per_month(2020))[0][1]
+
+        self.assertAlmostEqual(15.0, self.in_new_session(lambda: asyncio.run(book_then_read())))
+        self.assertEqual(0.0, self.in_new_session(lambda: asyncio.run(AsyncSolution.profit_per_month(2020)))[0][1])
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
@@ -0,0 +1,40 @@
+import unittest
+from collections import namedtuple
+
+from Utility.DBConnector import ResultSet, ResultSetDict
+from Business.Owner import Owner
+
+Column = namedtuple('Column', ['name', 'type_code'])
+
+'''
+    ResultSet tests, these do not need a database
+'''
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.result = ResultSet([Column('owner_id', 23), Column('owner_name', 25)],
+                                [(1, 'very owner'), (2, 'much owner')])
+
+    def test_rows(self) -> None:
+        self.assertEqual(2, self.result.size())
+        self.assertEqual({'owner_id': 1, 'owner_name': 'very owner'}, dict(self.result[0]))
+        self.assertEqual('much owner', self.result[1]['OWNER_NAME'], 'column names are case insensitive')
+        self.assertIsNone(self.result[0][0], 'non string keys give None')
+        self.assertEqual(Owner(2, 'much owner'), Owner(**self.result[1]))
+        self.assertEqual([1, 2], [row['owner_id'] for row in self.result])
+        self.assertEqual(ResultSetDict(), self.result[2], 'invalid row')
+
+    def test_columns(self) -> None:
+        self.assertEqual([1, 2], self.result['Owner_ID'])
+        self.assertIs(self.result['owner_id'], self.result['owner_id'], 'columns are not copied')
+        self.assertEqual([(1, 'very owner'), (2, 'much owner')], self.result.rows)
+
+    def test_empty(self) -> None:
+        self.assertTrue(ResultSet().isEmpty())
+        self.assertEqual([], list(ResultSet()))
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
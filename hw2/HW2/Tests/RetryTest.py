@@ -0,0 +1,58 @@
+import unittest
+
+from Utility.Exceptions import DatabaseException
+from Utility.Retry import RetryPolicy
+
+'''
+    RetryPolicy tests, these do not need a database
+'''
+
+
+class Test(unittest.TestCase):
+    def test_retries_until_success(self) -> None:
+        policy = RetryPolicy(max_retries=3, base_delay=0.0, max_delay=0.0)
+        failures = [DatabaseException.SERIALIZATION_FAILURE("SERIALIZATION_FAILURE"),
+                    DatabaseException.DEADLOCK_DETECTED("DEADLOCK_DETECTED")]
+        rollbacks = []
+
+        def attempt():
+            if failures:
+                raise failures.pop(0)
+            return "done"
+
+        self.assertEqual(("done", 2), policy.run(attempt, on_retry=lambda: rollbacks.append(1)))
+        self.assertEqual(2, len(rollbacks))
+        self.assertEqual({"retries": 2, "recovered": 1, "exhausted": 0}, policy.stats())
+
+    def test_gives_up(self) -> None:
+        policy = RetryPolicy(max_retries=2, base_delay=0.0, max_delay=0.0)
+        attempts = []
+
+        def attempt():
+            attempts.append(1)
+            raise DatabaseException.DEADLOCK_DETECTED("DEADLOCK_DETECTED")
+
+        self.assertRaises(DatabaseException.DEADLOCK_DETECTED, policy.run, attempt)
+        self.assertEqual(3, len(attempts))
+        self.assertEqual({"retries": 2, "recovered": 0, "exhausted": 1}, policy.stats())
+
+        # other errors are not retried
+        attempts.clear()
+
+        def violation():
+            attempts.append(1)
+            raise DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
+
+        self.assertRaises(DatabaseException.UNIQUE_VIOLATION, policy.run, violation)
+        self.assertEqual(1, len(attempts))
+
+    def test_backoff(self) -> None:
+        policy = RetryPolicy(base_delay=0.01, max_delay=0.05)
+        for attempt in range(10):
+            self.assertTrue(0 <= policy.delay(attempt) <= min(0.05, 0.01 * 2 ** attempt))
+        self.assertRaises(ValueError, RetryPolicy, max_retries=-1)
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
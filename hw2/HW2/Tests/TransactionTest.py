@@ -0,0 +1,64 @@
+import threading
+import unittest
+
+import Solution as Solution
+import Utility.DBConnector as Connector
+from Utility.ReturnValue import ReturnValue
+from Tests.AbstractTest import AbstractTest
+
+from Business.Apartment import Apartment
+from Business.Owner import Owner
+
+
+class Test(AbstractTest):
+    # Solution.py calls made inside a transaction() scope join it, their reads see the scope's writes
+    def test_reads_inside_scope(self) -> None:
+        apartment = Apartment(1, 'address', 'city', 'country', 50)
+        conn = Connector.DBConnector()
+        try:
+            with conn.transaction():
+                self.assertEqual(ReturnValue.OK, Solution.add_owner(Owner(1, 'owner')))
+                self.assertEqual(ReturnValue.OK, Solution.add_apartment(apartment))
+                self.assertEqual(ReturnValue.OK, Solution.owner_owns_apartment(1, 1))
+                self.assertEqual(Owner(1, 'owner'), Solution.get_owner(1))
+                self.assertEqual(apartment, Solution.get_apartment(1))
+                self.assertEqual(Owner(1, 'owner'), Solution.get_apartment_owner(1))
+                # a failing call only undoes itself
+                self.assertEqual(ReturnValue.ALREADY_EXISTS, Solution.add_owner(Owner(1, 'again')))
+                self.assertEqual(Owner(1, 'owner'), Solution.get_owner(1))
+        finally:
+            conn.close()
+        self.assertEqual(Owner(1, 'owner'), Solution.get_owner(1))
+
+        conn = Connector.DBConnector()
+        try:
+            with self.assertRaises(RuntimeError):
+                with conn.transaction():
+                    self.assertEqual(ReturnValue.OK, Solution.add_owner(Owner(2, 'rolled back')))
+                    self.assertEqual(Owner(2, 'rolled back'), Solution.get_owner(2))
+                    raise RuntimeError("roll back")
+        finally:
+            conn.close()
+        self.assertEqual(Owner.bad_owner(), Solution.get_owner(2))
+
+    # another thread caches the committed row while the scope deleting it is open, the commit drops it again
+    def test_cache_invalidated_at_commit(self) -> None:
+        self.assertEqual(ReturnValue.OK, Solution.add_owner(Owner(1, 'owner')))
+        conn = Connector.DBConnector()
+        try:
+            with conn.transaction():
+                self.assertEqual(ReturnValue.OK, Solution.delete_owner(1))
+                self.assertEqual(Owner.bad_owner(), Solution.get_owner(1))
+                read = []
+                reader = threading.Thread(target=lambda: read.append(Solution.get_owner(1)))
+                reader.start()
+                reader.join()
+                self.assertEqual([Owner(1, 'owner')], read)
+        finally:
+            conn.close()
+        self.assertEqual(Owner.bad_owner(), Solution.get_owner(1))
+
+
+# *** DO NOT RUN EACH TEST MANUALLY ***
+if __name__ == '__main__':
+    unittest.main(verbosity=2, exit=False)
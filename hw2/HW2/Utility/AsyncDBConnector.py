@@ -0,0 +1,143 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+from psycopg2 import sql
+
+import Utility.DBConnector as Connector
+from Utility.DBConnector import ResultSet, PreparedStatement
+
+
+# asyncio front end of DBConnector.
+# psycopg2's blocking calls run on the threads of a dedicated executor and the event loop only awaits them
+# (psycopg2 also has native async connections, but no pool or prepared statements for them, so the pooled
+# DBConnector is reused instead). the executor is sized like the connection pool.
+# a task holds one of as many permits as the executor has threads while it holds a connection: from connect()
+# to close(), or for a whole run() call. tasks wait for a permit on the event loop, never on an executor thread,
+# so an AsyncDBConnector holding a connection always finds a thread to run its statements and its close().
+#     async with await AsyncDBConnector.connect() as conn:
+#         rows_effected, result = await conn.execute("SELECT * FROM Owner")
+class AsyncDBConnector:
+    __executor = None
+    __executor_lock = threading.Lock()
+    __workers = 0
+    __permits = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore, a semaphore serves one loop
+
+    # constructor, use AsyncDBConnector.connect() to get one
+    def __init__(self, connector: Connector.DBConnector, permit: asyncio.Semaphore = None):
+        self.connector = connector
+        self.__permit = permit
+
+    # check a connection out of the pool without blocking the event loop.
+    # a caller cancelled during the checkout leaves the connection to be returned once the checkout is done
+    @staticmethod
+    async def connect() -> 'AsyncDBConnector':
+        permit = AsyncDBConnector.__loop_permits()
+        await permit.acquire()
+        try:
+            checkout = AsyncDBConnector.__submit(Connector.DBConnector)
+        except BaseException:
+            permit.release()
+            raise
+        try:
+            return AsyncDBConnector(await asyncio.shield(checkout), permit)
+        except asyncio.CancelledError:
+            checkout.add_done_callback(functools.partial(AsyncDBConnector.__abandoned, permit))
+            raise
+        except BaseException:
+            permit.release()
+            raise
+
+    # returns the connection to the pool, then the permit
+    async def close(self):
+        permit, self.__permit = self.__permit, None
+        closing = AsyncDBConnector.__submit(self.connector.close)
+        if permit is not None:
+            closing.add_done_callback(lambda _: permit.release())
+        await asyncio.shield(closing)
+
+    async def execute(self, query: Union[str, sql.Composed], printSchema=False, use_numpy=False) -> (int, ResultSet):
+        return await AsyncDBConnector.__submit(self.connector.execute, query, printSchema, use_numpy)
+
+    async def execute_prepared(self, statement: PreparedStatement, params: tuple = (), printSchema=False,
+                               use_numpy=False) -> (int, ResultSet):
+        return await AsyncDBConnector.__submit(self.connector.execute_prepared, statement, params, printSchema,
+                                               use_numpy)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # runs fn(*args, **kwargs) on the database executor and waits for it, fn may check out one connection.
+    # the permit is held until fn returns, even if the caller is cancelled before that
+    @staticmethod
+    async def run(fn, *args, **kwargs):
+        permit = AsyncDBConnector.__loop_permits()
+        await permit.acquire()
+        try:
+            call = AsyncDBConnector.__submit(fn, *args, **kwargs)
+        except BaseException:
+            permit.release()
+            raise
+        call.add_done_callback(lambda _: permit.release())
+        return await asyncio.shield(call)
+
+    # the executor running the blocking calls, sized after the connection pool
+    @staticmethod
+    def executor() -> ThreadPoolExecutor:
+        if AsyncDBConnector.__executor is None:
+            with AsyncDBConnector.__executor_lock:
+                if AsyncDBConnector.__executor is None:
+                    AsyncDBConnector.__workers = Connector.DBConnector.pool().max_size
+                    AsyncDBConnector.__executor = ThreadPoolExecutor(max_workers=AsyncDBConnector.__workers,
+                                                                     thread_name_prefix="db")
+                    AsyncDBConnector.__permits = weakref.WeakKeyDictionary()
+        return AsyncDBConnector.__executor
+
+    # replace the executor, e.g. after DBConnector.configure_pool() changed the pool size.
+    # max_workers should not exceed the pool size, or tasks holding a permit may wait for a connection
+    @staticmethod
+    def configure_executor(max_workers: int) -> ThreadPoolExecutor:
+        with AsyncDBConnector.__executor_lock:
+            old_executor = AsyncDBConnector.__executor
+            AsyncDBConnector.__workers = max_workers
+            AsyncDBConnector.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+            AsyncDBConnector.__permits = weakref.WeakKeyDictionary()
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+        return AsyncDBConnector.__executor
+
+    # the permits of the running event loop, one per executor thread
+    @staticmethod
+    def __loop_permits() -> asyncio.Semaphore:
+        AsyncDBConnector.executor()
+        loop = asyncio.get_running_loop()
+        with AsyncDBConnector.__executor_lock:
+            permits = AsyncDBConnector.__permits.get(loop)
+            if permits is None:
+                permits = AsyncDBConnector.__permits[loop] = asyncio.Semaphore(AsyncDBConnector.__workers)
+        return permits
+
+    # schedules fn(*args, **kwargs) on the executor, in a copy of the caller's context. the copy shares the
+    # caller's read-your-writes session, so a read after a write of the same task goes to the primary whichever
+    # thread serves it
+    @staticmethod
+    def __submit(fn, *args, **kwargs) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        Connector.DBConnector.session()
+        context = contextvars.copy_context()
+        return loop.run_in_executor(AsyncDBConnector.executor(), functools.partial(context.run, fn, *args, **kwargs))
+
+    # done callback of a checkout whose caller was cancelled: closes the connection, then releases the permit
+    @staticmethod
+    def __abandoned(permit: asyncio.Semaphore, checkout: asyncio.Future):
+        if checkout.cancelled() or checkout.exception() is not None:
+            permit.release()
+            return
+        AsyncDBConnector.__submit(checkout.result().close).add_done_callback(lambda _: permit.release())
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# thread safe in-process LRU cache whose entries also expire ttl seconds after they were stored.
+# used by Solution.py in front of its point lookups, the write functions invalidate what they change
+class LRUCache:
+    # constructor
+    # max_size - entries kept before the least recently used one is evicted, 0 disables the cache
+    # ttl - seconds an entry stays valid, None to keep entries until they are evicted or invalidated
+    def __init__(self, max_size: int = 4096, ttl: float = 60.0):
+        if max_size < 0:
+            raise ValueError("invalid cache size: %d" % max_size)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()  # key -> (value, time it expires), most recently used on the right
+        self.__version = 0  # bumped by every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # the cached value of key, or default (counted as a miss) when it is missing or expired
+    def get(self, key, default=None):
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    # the current version, take it before reading the value to put()
+    def version(self) -> int:
+        with self.__lock:
+            return self.__version
+
+    # stores value under key. with a version, nothing is stored if an invalidation happened since it was taken,
+    # as the value may have been read before the write that invalidated it
+    def put(self, key, value, version: int = None):
+        if self.max_size == 0:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.__lock:
+            if version is not None and version != self.__version:
+                return
+            self.__entries[key] = (value, expires)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self.__lock:
+            self.__version += 1
+            self.__entries.pop(key, None)
+
+    # drops every entry for which predicate(key, value) is true
+    def invalidate_where(self, predicate):
+        with self.__lock:
+            self.__version += 1
+            for key in [key for key, (value, _) in self.__entries.items() if predicate(key, value)]:
+                del self.__entries[key]
+
+    def clear(self):
+        with self.__lock:
+            self.__version += 1
+            self.__entries.clear()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    # hit, miss and eviction counters and the current size
+    def stats(self) -> dict:
+        with self.__lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self.__entries)}
+
+    def reset_stats(self):
+        with self.__lock:
+            self.hits = self.misses = self.evictions = 0
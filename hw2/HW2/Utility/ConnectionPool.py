@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+from Utility.Exceptions import DatabaseException
+
+# connections a forked child inherited from its parent. closing them, or letting them be garbage collected,
+# would send the server a Terminate message over the socket the parent still uses, so they are kept here
+# for the life of the process
+_inherited = []
+
+
+# a pooled connection remembers which prepared statements its session already knows,
+# how deep the DBConnector.transaction() scopes using it are nested
+# and what to run once the outermost scope commits (see DBConnector.after_commit)
+class PooledConnection(extensions.connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+        self.transaction_depth = 0
+        self.after_commit = []
+
+
+# process-wide pool of psycopg2 connections, shared by every DBConnector.
+# connections are checked out by DBConnector() and returned by DBConnector.close(),
+# so Solution.py pays for the TCP connection, authentication and backend fork only once.
+# the pool is thread safe, a single checked out connection is not (use one DBConnector per thread).
+class ConnectionPool:
+    # constructor
+    # min_size - connections opened eagerly and kept open even when idle
+    # max_size - upper bound of open connections, checkout blocks when all of them are in use
+    # idle_timeout - seconds an idle connection above min_size is kept before it is closed
+    # checkout_timeout - seconds to wait for a free connection before giving up
+    # health_check_after - idle seconds after which a connection is pinged before it is handed out
+    def __init__(self, params: dict, min_size: int = 1, max_size: int = 10, idle_timeout: float = 300.0,
+                 checkout_timeout: float = 30.0, health_check_after: float = 30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("invalid pool size: min_size=%d, max_size=%d" % (min_size, max_size))
+        self.params = dict(params)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+
+        self.__lock = threading.Condition()
+        self.__idle = deque()  # (connection, time it was returned), most recently used on the right
+        self.__in_use = set()
+        self.__size = 0  # idle + in use + connections being opened
+        self.__pid = os.getpid()
+        self.__closed = False
+
+        for _ in range(min_size):
+            connection = self.__connect()
+            with self.__lock:
+                self.__size += 1
+                self.__idle.append((connection, time.monotonic()))
+
+    # number of open connections (idle and in use)
+    def size(self) -> int:
+        with self.__lock:
+            return self.__size
+
+    # number of connections waiting in the pool
+    def idle(self) -> int:
+        with self.__lock:
+            return len(self.__idle)
+
+    # number of connections checked out
+    def in_use(self) -> int:
+        with self.__lock:
+            return len(self.__in_use)
+
+    # take a healthy connection out of the pool, opening a new one if there is room
+    def getconn(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            connection, idle_since = self.__checkout(deadline)
+            if connection is None:
+                # a slot was reserved for us, open a new connection outside the lock
+                try:
+                    connection = self.__connect()
+                except Exception:
+                    with self.__lock:
+                        self.__size -= 1
+                        self.__lock.notify()
+                    raise
+            elif not self.__healthy(connection, idle_since):
+                self.__discard(connection)
+                continue
+            with self.__lock:
+                self.__in_use.add(connection)
+            return connection
+
+    # give a connection back, rolling back whatever transaction it was left in
+    def putconn(self, connection, discard: bool = False):
+        with self.__lock:
+            self.__after_fork()
+            if connection not in self.__in_use:
+                # checked out before a fork, or not ours: it does not count towards this pool's size
+                return
+            self.__in_use.discard(connection)
+        if not discard and not connection.closed:
+            connection.transaction_depth = 0
+            connection.after_commit.clear()
+            try:
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        if discard or connection.closed or self.__closed:
+            self.__discard(connection)
+            return
+        with self.__lock:
+            self.__idle.append((connection, time.monotonic()))
+            self.__lock.notify()
+
+    # close every idle connection, connections in use are closed when they are returned
+    def closeall(self):
+        with self.__lock:
+            self.__closed = True
+            idle = [connection for connection, _ in self.__idle]
+            self.__idle.clear()
+        for connection in idle:
+            self.__discard(connection)
+
+    # returns (connection, idle_since) or (None, None) when the caller should open a new connection
+    def __checkout(self, deadline: float):
+        with self.__lock:
+            if self.__closed:
+                raise DatabaseException.ConnectionInvalid("Connection pool is closed")
+            self.__after_fork()
+            while True:
+                self.__reap_idle()
+                if self.__idle:
+                    return self.__idle.pop()
+                if self.__size < self.max_size:
+                    self.__size += 1
+                    return None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DatabaseException.ConnectionInvalid("Connection pool exhausted")
+                self.__lock.wait(remaining)
+
+    # in a forked child, forget the parent's connections without closing them. caller holds the lock
+    def __after_fork(self):
+        if os.getpid() == self.__pid:
+            return
+        self.__pid = os.getpid()
+        for connection in [connection for connection, _ in self.__idle] + list(self.__in_use):
+            ConnectionPool.__detach(connection)
+        self.__idle.clear()
+        self.__in_use.clear()
+        self.__size = 0
+
+    # point the inherited socket at /dev/null, so nothing this process sends on the connection reaches
+    # the server, and keep the connection from ever being closed
+    @staticmethod
+    def __detach(connection):
+        try:
+            if not connection.closed:
+                devnull = os.open(os.devnull, os.O_RDWR)
+                try:
+                    os.dup2(devnull, connection.fileno())
+                finally:
+                    os.close(devnull)
+        except Exception:
+            pass
+        _inherited.append(connection)
+
+    # close connections that stayed idle for too long, never going below min_size. caller holds the lock
+    def __reap_idle(self):
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        # the least recently used connections are on the left
+        while self.__idle and self.__size > self.min_size and now - self.__idle[0][1] > self.idle_timeout:
+            connection, _ = self.__idle.popleft()
+            self.__size -= 1
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def __healthy(self, connection, idle_since: float) -> bool:
+        if connection.closed:
+            return False
+        if self.health_check_after is not None and time.monotonic() - idle_since > self.health_check_after:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                connection.rollback()
+            except Exception:
+                return False
+        return True
+
+    def __discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self.__lock:
+            self.__size -= 1
+            self.__lock.notify()
+
+    def __connect(self):
+        connection = psycopg2.connect(connection_factory=PooledConnection, **self.params)
+        connection.autocommit = False
+        return connection
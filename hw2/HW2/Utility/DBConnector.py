@@ -1,9 +1,24 @@
-import psycopg2
 from psycopg2 import errors, sql
 from configparser import ConfigParser
+from Utility.ConnectionPool import ConnectionPool
 from Utility.Exceptions import DatabaseException
+from Utility.Retry import RetryPolicy
+import Utility.Metrics as Metrics
+import contextvars
+import io
+import itertools
+import math
 import os
-from typing import Union
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Iterable, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class ResultSetDict(dict):
@@ -13,89 +28,369 @@ class ResultSetDict(dict):
         return super().__getitem__(item.lower())
 
 
+# postgres type codes of the columns ResultSet may store as numpy arrays
+_NUMPY_TYPES = {20: "int64", 21: "int64", 23: "int64", 700: "float64", 701: "float64"}
+
+
+# one row of a ResultSet, read like a ResultSetDict (row["col"], for col in row, Owner(**row))
+# without copying the row out of the ResultSet's columns
+class ResultRow(Mapping):
+    __slots__ = ("_result_set", "_index")
+
+    def __init__(self, result_set: 'ResultSet', index: int):
+        self._result_set = result_set
+        self._index = index
+
+    def __getitem__(self, item):
+        if type(item) is not str:
+            return None
+        column = self._result_set.columns[self._result_set.cols[item]]
+        value = column[self._index]
+        return value if type(column) is list else value.item()
+
+    def __iter__(self):
+        return iter(self._result_set.cols_header)
+
+    def __len__(self):
+        return len(self._result_set.cols_header)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
 class ResultSet:
     # constructor
-    def __init__(self, description=None, results=None):
-        self.rows = []
+    # use_numpy - keep integer and float columns as numpy arrays (when numpy is installed)
+    def __init__(self, description=None, results=None, use_numpy=False):
+        self.columns = []  # one list (or numpy array) of values per column
         self.cols_header = []
         self.cols = ResultSetDict()
-        self.__fromQuery(description, results)
+        self.__size = 0
+        self.__fromQuery(description, results, use_numpy)
 
+    # result[i] is a view of row i, result["col"] is the column itself (shared, do not modify it)
     def __getitem__(self, idx):
         if type(idx) == str:
-            return [x[self.cols[idx]] for x in self.rows]
+            return self.columns[self.cols[idx]]
         return self.__getRow(idx)
 
+    # the rows as tuples, built on demand
+    @property
+    def rows(self) -> list:
+        return list(zip(*self.columns))
+
     # so you can use print(ResultSet)
     def __str__(self):
         string = ""
         for col in self.cols_header:
             string += str(col) + "   "
         string += '\n'
-        for row in self.rows:
+        for row in zip(*self.columns):
             for val in row:
                 string += str(val) + "   "
             string += '\n'
         return string
 
     def __iter__(self):
-        for row in range(len(self.rows)):
-            yield self.__getRow(row)
+        for row in range(self.__size):
+            yield ResultRow(self, row)
 
     # what is the size of the ResultSet?
     def size(self):
-        return len(self.rows)
+        return self.__size
 
     # is the ResultSet empty?
     def isEmpty(self):
         return self.size() == 0
 
     def __getRow(self, row: int):
-        if len(self.rows) <= row:
+        if self.__size <= row or row < -self.__size:
             print('Invalid row ' + str(row))
             return ResultSetDict()
-        row_to_return = ResultSetDict()
-        for val, col in zip(self.rows[row], self.cols_header):
-            row_to_return[col] = val
-        return row_to_return
+        return ResultRow(self, row % self.__size)
 
-    def __fromQuery(self, description, results: list):
+    def __fromQuery(self, description, results: list, use_numpy: bool):
         if results is None or len(results) == 0:  # no results
             self.cols = ResultSetDict()
         else:
-            self.rows = results.copy()
+            self.__size = len(results)
             self.cols_header = [d.name for d in description]
+            self.columns = [list(column) for column in zip(*results)]
             self.cols = ResultSetDict()
             for col, index in zip(self.cols_header, range(len(results[0]))):
                 self.cols[col] = index
+            if use_numpy and numpy is not None:
+                for index, d in enumerate(description):
+                    if d.type_code in _NUMPY_TYPES and None not in self.columns[index]:
+                        self.columns[index] = numpy.array(self.columns[index], dtype=_NUMPY_TYPES[d.type_code])
 
 
-class DBConnector:
+# a named server-side prepared statement, query uses $1, $2, ... for its parameters
+# e.g. PreparedStatement("get_owner", "SELECT * FROM Owner WHERE Owner_ID = $1", ["INTEGER"])
+class PreparedStatement:
     # constructor
+    def __init__(self, name: str, query: str, arg_types: list = ()):
+        self.name = name
+        self.query = query
+        self.arg_types = list(arg_types)
+        types = "(" + ", ".join(self.arg_types) + ")" if self.arg_types else ""
+        self.prepare_sql = "PREPARE " + name + types + " AS " + query
+        placeholders = "(" + ", ".join(["%s"] * len(self.arg_types)) + ")" if self.arg_types else ""
+        self.execute_sql = "EXECUTE " + name + placeholders
+
+    def __str__(self):
+        return self.prepare_sql
+
+
+# file-like object feeding rows to COPY FROM STDIN in text format, one chunk of rows at a time
+class _CopyStream(io.TextIOBase):
+    ROWS_PER_CHUNK = 1000
+    ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+    def __init__(self, rows: Iterable[tuple]):
+        self.rows = iter(rows)
+        self.buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while self.rows is not None and (size < 0 or len(self.buffer) < size):
+            lines = []
+            for row in self.rows:
+                lines.append("\t".join(_CopyStream.__format(val) for val in row) + "\n")
+                if len(lines) == _CopyStream.ROWS_PER_CHUNK:
+                    break
+            else:
+                self.rows = None
+            self.buffer += "".join(lines)
+        if size < 0 or size >= len(self.buffer):
+            chunk, self.buffer = self.buffer, ""
+        else:
+            chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+    @staticmethod
+    def __format(val) -> str:
+        if val is None:
+            return "\\N"
+        if isinstance(val, str):
+            return val.translate(_CopyStream.ESCAPES)
+        if hasattr(val, "isoformat"):
+            return val.isoformat()
+        return str(val)
+
+
+# the connection of the transaction() scope currently open in each thread
+_local = threading.local()
+
+
+# a read-your-writes session: the time of its last write to the primary (see DBConnector.configure_replicas).
+# the session is held in a context variable, so every thread has its own, and calls that AsyncDBConnector.run
+# (or SolutionExecutor) hands to a worker thread keep the session of their caller
+class Session:
+    __slots__ = ("last_write",)
+
     def __init__(self):
+        self.last_write = -math.inf
+
+
+_session = contextvars.ContextVar("session")
+# unique names for the server-side cursors of stream()
+_cursor_ids = itertools.count(1)
+
+
+class DBConnector:
+    # process-wide connection pool, created on first use from database.ini
+    __pool = None
+    __pool_lock = threading.Lock()
+    # process-wide retry policy of the statements committed outside of a transaction() scope
+    __retry_policy = RetryPolicy()
+    # read replica pools, created on first use from the [replica...] sections of database.ini
+    __replicas = None
+    __routing = "least_loaded"
+    __sticky_seconds = 5.0
+    __next_replica = itertools.count()
+    # database.ini, parsed on first use and parsed again when it changes, see config()
+    CONFIG_CHECK_INTERVAL = 1.0  # seconds between looks at database.ini's modification time
+    __ini = None  # (path, modification time, {section: {parameter: value}})
+    __ini_checked = 0.0
+    __ini_lock = threading.Lock()
+    __pool_from_ini = False  # pools built from database.ini are replaced when it changes
+    __replicas_from_ini = False
+
+    # constructor, checks a connection out of the pool
+    # or joins the transaction() scope open in this thread, if there is one.
+    # read_only - the caller only reads, so a read replica may serve it (see configure_replicas)
+    def __init__(self, read_only: bool = False):
+        self.__wait = 0.0  # seconds the pool checkout took, reported with the first statement's metrics
+        self.__retries = 0  # retries the last statement took, reported with its metrics
+        self.__source = None  # the pool the connection came from, None for a joined connection
+        self.__on_replica = False
         try:
-            # Obtain the configuration parameters
-            params = DBConnector.__config()
-            self.connection = psycopg2.connect(**params)
-            self.connection.autocommit = False
+            connection = getattr(_local, "connection", None)
+            self.__joined = connection is not None and not connection.closed
+            if self.__joined:
+                self.connection = connection
+            elif Metrics.sinks:
+                start = time.perf_counter()
+                self.connection = self.__checkout(read_only)
+                self.__wait = time.perf_counter() - start
+            else:
+                self.connection = self.__checkout(read_only)
             self.cursor = self.connection.cursor()
         except Exception as e:
             self.connection = None
             self.cursor = None
             raise DatabaseException.ConnectionInvalid("Could not connect to database")
 
-    # close connection
+    # a connection of a replica for read_only callers that did not write recently, otherwise of the primary.
+    # a replica that cannot be reached is skipped for the primary
+    def __checkout(self, read_only: bool):
+        if read_only and time.monotonic() - DBConnector.session().last_write >= DBConnector.__sticky_seconds:
+            replica = DBConnector.__replica()
+            if replica is not None:
+                try:
+                    connection = replica.getconn()
+                    self.__source = replica
+                    self.__on_replica = True
+                    return connection
+                except Exception as e:
+                    print(e)
+        self.__source = DBConnector.pool()
+        return self.__source.getconn()
+
+    # is the connection one of a read replica?
+    def on_replica(self) -> bool:
+        return self.__on_replica
+
+    # close connection, returning it to the pool (a joined connection stays with its transaction)
     def close(self):
         if self.cursor is not None:
             self.cursor.close()
+            self.cursor = None
         if self.connection is not None:
-            self.connection.close()
+            if not self.__joined:
+                self.__source.putconn(self.connection)
+            self.connection = None
+
+    # the process-wide connection pool
+    @staticmethod
+    def pool() -> ConnectionPool:
+        if DBConnector.__pool_from_ini and DBConnector.__ini_changed():
+            DBConnector.reload_config()
+        pool = DBConnector.__pool
+        if pool is None:
+            with DBConnector.__pool_lock:
+                if DBConnector.__pool is None:
+                    DBConnector.__pool = ConnectionPool(DBConnector.config())
+                    DBConnector.__pool_from_ini = True
+                pool = DBConnector.__pool
+        return pool
+
+    # replace the process-wide pool, e.g. configure_pool(min_size=2, max_size=20)
+    # params defaults to the connection parameters of config()
+    @staticmethod
+    def configure_pool(params: dict = None, **pool_options) -> ConnectionPool:
+        with DBConnector.__pool_lock:
+            old_pool = DBConnector.__pool
+            DBConnector.__pool = ConnectionPool(params if params is not None else DBConnector.config(),
+                                                **pool_options)
+            DBConnector.__pool_from_ini = params is None
+        if old_pool is not None:
+            old_pool.closeall()
+        return DBConnector.__pool
+
+    # close every pooled connection (of the primary and of the replicas), the next DBConnector() creates fresh pools
+    @staticmethod
+    def close_pool():
+        with DBConnector.__pool_lock:
+            old_pools = [DBConnector.__pool] + (DBConnector.__replicas or [])
+            DBConnector.__pool = None
+            DBConnector.__replicas = None
+        for old_pool in old_pools:
+            if old_pool is not None:
+                old_pool.closeall()
+
+    # the read replica pools, empty when database.ini has no [replica...] section
+    @staticmethod
+    def replicas() -> list:
+        replicas = DBConnector.__replicas
+        if replicas is None:
+            with DBConnector.__pool_lock:
+                if DBConnector.__replicas is None:
+                    DBConnector.__replicas = [ConnectionPool(DBConnector.__read_only(params), min_size=0)
+                                              for params in DBConnector.replica_configs()]
+                    DBConnector.__replicas_from_ini = True
+                replicas = DBConnector.__replicas
+        return replicas
+
+    # replace the read replica pools. DBConnector(read_only=True) is served by a replica, picked by routing:
+    # "least_loaded" (fewest connections checked out) or "round_robin". for read-your-writes, a thread that wrote
+    # to the primary reads from the primary for the next sticky_seconds, which should exceed the replication lag.
+    # the window is kept per Session (a thread, or the caller of an async call).
+    # replica_params defaults to the [replica...] sections of database.ini, configure_replicas([]) turns routing off.
+    # replica sessions are read only, a write sent to a replica fails instead of diverging from the primary
+    @staticmethod
+    def configure_replicas(replica_params: list = None, routing: str = "least_loaded", sticky_seconds: float = 5.0,
+                           **pool_options) -> list:
+        if routing not in ("least_loaded", "round_robin"):
+            raise ValueError("unknown replica routing: " + routing)
+        from_ini = replica_params is None
+        if from_ini:
+            replica_params = DBConnector.replica_configs()
+        pool_options.setdefault("min_size", 0)
+        with DBConnector.__pool_lock:
+            old_pools = DBConnector.__replicas or []
+            DBConnector.__replicas = [ConnectionPool(DBConnector.__read_only(params), **pool_options)
+                                      for params in replica_params]
+            DBConnector.__replicas_from_ini = from_ini
+            DBConnector.__routing = routing
+            DBConnector.__sticky_seconds = sticky_seconds
+        for old_pool in old_pools:
+            old_pool.closeall()
+        return DBConnector.__replicas
+
+    @staticmethod
+    def __replica():
+        replicas = DBConnector.replicas()
+        if not replicas:
+            return None
+        if DBConnector.__routing == "round_robin":
+            return replicas[next(DBConnector.__next_replica) % len(replicas)]
+        return min(replicas, key=ConnectionPool.in_use)
+
+    # connection parameters whose sessions default to read only transactions
+    @staticmethod
+    def __read_only(params: dict) -> dict:
+        params = dict(params)
+        params["options"] = (params.get("options", "") + " -c default_transaction_read_only=on").strip()
+        return params
+
+    # the process-wide retry policy
+    @staticmethod
+    def retry_policy() -> RetryPolicy:
+        return DBConnector.__retry_policy
+
+    # replace the process-wide retry policy, e.g. configure_retry(max_retries=10, base_delay=0.01).
+    # configure_retry(max_retries=0) turns retrying off
+    @staticmethod
+    def configure_retry(**policy_options) -> RetryPolicy:
+        DBConnector.__retry_policy = RetryPolicy(**policy_options)
+        return DBConnector.__retry_policy
 
     # commit connection's changes
+    # a serialization failure or deadlock detected at commit is raised as such, so it can be retried
     def commit(self):
         if self.connection is not None:
             try:
-                self.connection.commit()
+                with self.__errors():
+                    self.connection.commit()
+            except (DatabaseException.SERIALIZATION_FAILURE, DatabaseException.DEADLOCK_DETECTED):
+                raise
             except Exception:
                 raise DatabaseException.ConnectionInvalid("Could not commit changes")
 
@@ -107,17 +402,281 @@ class DBConnector:
             except Exception:
                 raise DatabaseException.ConnectionInvalid("Could not rollback changes")
 
+    # is the connection inside a transaction() scope (of this or of an enclosing DBConnector)?
+    def in_transaction(self) -> bool:
+        return self.connection is not None and self.connection.transaction_depth > 0
+
+    # transaction scope: the statements executed inside it are committed together when the block ends,
+    # or rolled back if it raises. a scope opened inside another one becomes a savepoint.
+    # while the outermost scope is open, DBConnectors created in the same thread join it, so a batch of
+    # Solution.py calls shares a single commit:
+    #     conn = Connector.DBConnector()
+    #     with conn.transaction():
+    #         Solution.add_owner(owner)
+    #         Solution.owner_owns_apartment(owner_id, apartment_id)
+    #     conn.close()
+    # each statement of a joined DBConnector runs in its own savepoint, so a failing one only undoes itself
+    @contextmanager
+    def transaction(self):
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        connection = self.connection
+        if connection.transaction_depth == 0:
+            connection.transaction_depth = 1
+            _local.connection = connection
+            try:
+                yield self
+            except BaseException:
+                self.rollback()
+                raise
+            else:
+                self.commit()
+                hooks = list(connection.after_commit)
+                for hook in hooks:
+                    try:
+                        hook()
+                    except Exception as e:
+                        print(e)
+            finally:
+                connection.transaction_depth = 0
+                connection.after_commit.clear()
+                _local.connection = None
+        else:
+            # the savepoint commands run on a cursor of their own, so the result of the last statement
+            # of the scope stays readable on self.cursor after RELEASE
+            connection.transaction_depth += 1
+            savepoint = "savepoint_" + str(connection.transaction_depth)
+            with connection.cursor() as control:
+                control.execute("SAVEPOINT " + savepoint)
+                try:
+                    yield self
+                except BaseException:
+                    control.execute("ROLLBACK TO SAVEPOINT " + savepoint)
+                    raise
+                else:
+                    control.execute("RELEASE SAVEPOINT " + savepoint)
+                finally:
+                    connection.transaction_depth -= 1
+
+    # runs fn() once the outermost transaction() scope commits, or right away outside of one.
+    # nothing runs if the scope rolls back. fn also runs when only the savepoint it was registered in
+    # rolled back, so use it for work that is harmless to repeat, like invalidating a cache
+    def after_commit(self, fn):
+        if self.in_transaction():
+            self.connection.after_commit.append(fn)
+        else:
+            fn()
+
     # executes the query, if it is SELECT you may ask to print the results with printSchema
     # returns the number of rows effected and a ResultSet (for SELECT)
-    def execute(self, query: Union[str, sql.Composed], printSchema=False) -> (int, ResultSet):
+    # use_numpy keeps the numeric columns of the ResultSet as numpy arrays
+    def execute(self, query: Union[str, sql.Composed], printSchema=False, use_numpy=False) -> (int, ResultSet):
+        if Metrics.sinks:
+            return self.__measured(None, query, lambda: self.__execute(query, None, printSchema, use_numpy))
+        return self.__execute(query, None, printSchema, use_numpy)
+
+    # executes a named prepared statement with the given parameters.
+    # the statement is PREPAREd the first time this pooled connection sees it, later calls only bind and EXECUTE
+    def execute_prepared(self, statement: 'PreparedStatement', params: tuple = (),
+                         printSchema=False, use_numpy=False) -> (int, ResultSet):
+        if Metrics.sinks:
+            return self.__measured(statement.name, None,
+                                   lambda: self.__execute_prepared(statement, params, printSchema, use_numpy))
+        return self.__execute_prepared(statement, params, printSchema, use_numpy)
+
+    def __execute_prepared(self, statement, params, printSchema, use_numpy) -> (int, ResultSet):
         if self.connection is None:
             raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        if statement.name not in self.connection.prepared:
+            self.__statement(statement.prepare_sql, None)
+            self.connection.prepared.add(statement.name)
+        return self.__execute(statement.execute_sql, params, printSchema, use_numpy)
+
+    # runs a batch of statements in one transaction() scope and returns the rowcount of each, in order.
+    # a statement is a query (str or sql.Composed), a PreparedStatement, or a (query or PreparedStatement, params)
+    # pair. by default the first failing statement raises its DatabaseException and undoes the whole batch.
+    # with savepoints=True every statement runs in a savepoint of its own: a failing one is undone alone and its
+    # exception takes its place in the returned list.
+    # psycopg2 has no pipeline mode, so each statement is still a round trip of its own, but the savepoint
+    # commands travel in the same message as their statement and the batch is committed once
+    def execute_many(self, statements: Iterable, savepoints=False) -> list:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        results = []
+        with self.transaction():
+            for statement in statements:
+                name, query, params = self.__batch_statement(statement)
+                if savepoints:
+                    prefix = "SAVEPOINT execute_many; " if not results else \
+                        "RELEASE SAVEPOINT execute_many; SAVEPOINT execute_many; "
+                    query = prefix + query if isinstance(query, str) else sql.SQL(prefix) + query
+                try:
+                    if Metrics.sinks:
+                        rows, _ = self.__measured(name, query, lambda: (self.__run(query, params), None))
+                    else:
+                        rows = self.__run(query, params)
+                except Exception as e:
+                    if not savepoints:
+                        raise
+                    self.cursor.execute("ROLLBACK TO SAVEPOINT execute_many")
+                    rows = e
+                results.append(rows)
+            if savepoints and results:
+                self.cursor.execute("RELEASE SAVEPOINT execute_many")
+        DBConnector.__wrote()
+        return results
+
+    # (name for the metrics, query, params) of an execute_many statement, PREPAREs prepared statements if needed
+    def __batch_statement(self, statement) -> tuple:
+        params = None
+        if isinstance(statement, tuple):
+            statement, params = statement
+        if not isinstance(statement, PreparedStatement):
+            return None, statement, params
+        if statement.name not in self.connection.prepared:
+            self.__run(statement.prepare_sql, None)
+            self.connection.prepared.add(statement.name)
+        return statement.name, statement.execute_sql, tuple(params or ())
 
-        # try execute the query
+    # runs execute and hands its metrics to the Metrics sinks. the query is reported by name if it has one
+    def __measured(self, name, query, execute) -> (int, ResultSet):
+        rows, error = 0, None
+        start = time.perf_counter()
         try:
-            self.cursor.execute(query)
-            row_effected = max(self.cursor.rowcount, 0)
+            rows, entries = execute()
+            return rows, entries
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            if name is None:
+                name = Metrics.query_shape(query if isinstance(query, str) else self.__as_string(query))
+            wait, self.__wait = self.__wait, 0.0
+            retries, self.__retries = self.__retries, 0
+            Metrics.emit(name, seconds, rows, wait, error, retries)
+
+    def __as_string(self, query) -> str:
+        try:
+            return query.as_string(self.connection)
+        except Exception:
+            return repr(query)
+
+    def __execute(self, query, params, printSchema, use_numpy) -> (int, ResultSet):
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+
+        self.__retries = 0
+        if self.connection.transaction_depth == 0:
+            # outside of a transaction() scope every statement is committed on its own,
+            # so a serialization failure or deadlock can be retried right here
+            row_effected, _ = DBConnector.__retry_policy.run(lambda: self.__committed(query, params),
+                                                             on_retry=self.__before_retry)
+        else:
+            row_effected = self.__statement(query, params)
+        if not (self.cursor.statusmessage or "").startswith(("SELECT", "EXPLAIN", "SHOW")):
+            DBConnector.__wrote()
+
+        # get entries in case of SELECT
+        if self.cursor.description is not None:
+            entries = ResultSet(self.cursor.description, self.cursor.fetchall(), use_numpy)
+        else:
+            entries = ResultSet()
+
+        # print SELECT entries
+        if printSchema:
+            print(entries)
+
+        return row_effected, entries
+
+    # streams the result of a SELECT through a named server-side cursor, fetching itersize rows per round trip,
+    # so results larger than the client's memory can be processed. yields the rows one at a time,
+    # or ResultSets of up to itersize rows with batches=True.
+    # outside of a transaction() scope the cursor's transaction ends when the generator is exhausted or closed
+    def stream(self, query: Union[str, sql.Composed], params: tuple = None, itersize: int = 2000, batches=False,
+               use_numpy=False):
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        cursor = self.connection.cursor(name="stream_" + str(next(_cursor_ids)))
+        cursor.itersize = itersize
+        try:
+            with self.__errors():
+                cursor.execute(query, params)
+            while True:
+                with self.__errors():
+                    rows = cursor.fetchmany(itersize)
+                if len(rows) == 0:
+                    break
+                batch = ResultSet(cursor.description, rows, use_numpy)
+                if batches:
+                    yield batch
+                else:
+                    yield from batch
+        except BaseException:
+            if self.connection.transaction_depth == 0:
+                self.rollback()
+            cursor.close()
+            raise
+        cursor.close()
+        if self.connection.transaction_depth == 0:
             self.commit()
+
+    # streams rows (tuples in the order of columns) into table with COPY FROM STDIN.
+    # the rows are not committed, call commit() or use a transaction() scope
+    # returns the number of rows copied
+    def copy_from(self, table: str, columns: list, rows: Iterable[tuple]) -> int:
+        if self.connection is None:
+            raise DatabaseException.ConnectionInvalid("Connection Invalid")
+        query = "COPY " + table + "(" + ", ".join(columns) + ") FROM STDIN"
+        with self.__errors():
+            self.cursor.copy_expert(query, _CopyStream(rows))
+        DBConnector.__wrote()
+        return max(self.cursor.rowcount, 0)
+
+    # the read-your-writes session of the current context, created on first use
+    @staticmethod
+    def session() -> Session:
+        session = _session.get(None)
+        if session is None:
+            session = Session()
+            _session.set(session)
+        return session
+
+    # starts the read-your-writes window of the session, in which its read_only DBConnectors use the primary
+    @staticmethod
+    def __wrote():
+        DBConnector.session().last_write = time.monotonic()
+
+    # rolls back the aborted statement before it is retried
+    def __before_retry(self):
+        self.rollback()
+        self.__retries += 1
+
+    # runs a single statement outside of a transaction() scope and commits it
+    def __committed(self, query, params) -> int:
+        row_effected = self.__run(query, params)
+        self.commit()
+        return row_effected
+
+    # runs a single statement, in a savepoint of its own when joined to another DBConnector's transaction
+    def __statement(self, query, params) -> int:
+        if not self.__joined:
+            return self.__run(query, params)
+        with self.transaction():
+            return self.__run(query, params)
+
+    # try execute the query
+    def __run(self, query, params) -> int:
+        with self.__errors():
+            self.cursor.execute(query, params)
+            return max(self.cursor.rowcount, 0)
+
+    # maps constraint violations to DatabaseException
+    @staticmethod
+    @contextmanager
+    def __errors():
+        try:
+            yield
         except errors.lookup("23502"):
             raise DatabaseException.NOT_NULL_VIOLATION("NOT_NULL_VIOLATION")
         except errors.lookup("23503"):
@@ -126,38 +685,102 @@ class DBConnector:
             raise DatabaseException.UNIQUE_VIOLATION("UNIQUE_VIOLATION")
         except errors.lookup("23514"):
             raise DatabaseException.CHECK_VIOLATION("CHECK_VIOLATION")
+        except errors.lookup("23P01"):
+            raise DatabaseException.EXCLUSION_VIOLATION("EXCLUSION_VIOLATION")
+        except errors.lookup("40001"):
+            raise DatabaseException.SERIALIZATION_FAILURE("SERIALIZATION_FAILURE")
+        except errors.lookup("40P01"):
+            raise DatabaseException.DEADLOCK_DETECTED("DEADLOCK_DETECTED")
 
-        # get entries in case of SELECT
-        if self.cursor.description is not None:
-            entries = ResultSet(self.cursor.description, self.cursor.fetchall())
-        else:
-            entries = ResultSet()
+    # connection parameters of the primary, the [postgresql] section of database.ini.
+    # the DATABASE_URL environment variable (a libpq connection string or a postgresql:// URI) overrides the file,
+    # which is then not read at all. the file is parsed once and parsed again when it changes (see pool())
+    # or when reload_config() is called
+    @staticmethod
+    def config() -> dict:
+        url = os.environ.get("DATABASE_URL")
+        if url:
+            return {"dsn": url}
+        sections = DBConnector.__ini_sections()
+        if "postgresql" not in sections:
+            raise DatabaseException.database_ini_ERROR("Please modify database.ini file under Utility")
+        return dict(sections["postgresql"])
 
-        # print SELECT entries
-        if printSchema:
-            print(entries)
+    # connection parameters of the read replicas: the sections of database.ini named replica, replica1, replica2...
+    # in file order, e.g.
+    #     [replica1]
+    #     host=replica1.example.com
+    # a parameter missing from a replica section is taken from [postgresql].
+    # with DATABASE_URL or DATABASE_REPLICA_URLS (postgresql:// URIs separated by spaces) set, the replicas are
+    # those of DATABASE_REPLICA_URLS and the file is not read
+    @staticmethod
+    def replica_configs() -> list:
+        if os.environ.get("DATABASE_URL") or os.environ.get("DATABASE_REPLICA_URLS"):
+            return [{"dsn": url} for url in os.environ.get("DATABASE_REPLICA_URLS", "").split()]
+        sections = DBConnector.__ini_sections()
+        primary = sections.get("postgresql", {})
+        return [dict(primary, **params) for section, params in sections.items() if section.startswith("replica")]
 
-        return row_effected, entries
+    # parse database.ini again now. the pools built from it are closed, the next DBConnector() opens new ones
+    # with the new parameters (connections checked out at the moment are closed when they are returned)
+    @staticmethod
+    def reload_config():
+        with DBConnector.__ini_lock:
+            DBConnector.__ini = DBConnector.__parse_ini()
+            DBConnector.__ini_checked = time.monotonic()
+        with DBConnector.__pool_lock:
+            old_pools = []
+            if DBConnector.__pool_from_ini:
+                old_pools.append(DBConnector.__pool)
+                DBConnector.__pool = None
+            if DBConnector.__replicas_from_ini:
+                old_pools += DBConnector.__replicas or []
+                DBConnector.__replicas = None
+        for old_pool in old_pools:
+            if old_pool is not None:
+                old_pool.closeall()
 
-    # grant credentials
-    @staticmethod
-    def __config(filename=os.path.join(os.path.join(os.getcwd(), "Utility"), 'database.ini'),
-                 section='postgresql'):
-        # create a parser
-        parser = ConfigParser()
-        # read config file
-        parser.read(filename)
-
-        # get section
-        db = {}
-        if parser.has_section(section):
-            params = parser.items(section)
-            for param in params:
-                db[param[0]] = param[1]
-        else:
-            # file not found
-            db = DBConnector.__config(
-                filename=os.path.join(os.path.join(os.path.dirname(os.getcwd()), 'Utility'), 'database.ini'))
-            if db is None:
-                raise DatabaseException.database_ini_ERROR("Please modify database.ini file under Utility")
-        return db
+    # {section: {parameter: value}} of database.ini
+    @staticmethod
+    def __ini_sections() -> dict:
+        if DBConnector.__ini is None:
+            with DBConnector.__ini_lock:
+                if DBConnector.__ini is None:
+                    DBConnector.__ini = DBConnector.__parse_ini()
+                    DBConnector.__ini_checked = time.monotonic()
+        return DBConnector.__ini[2]
+
+    # has database.ini changed since it was parsed? its modification time is looked at no more than
+    # every CONFIG_CHECK_INTERVAL seconds, so DBConnector() mostly pays for a clock read
+    @staticmethod
+    def __ini_changed() -> bool:
+        ini = DBConnector.__ini
+        now = time.monotonic()
+        if ini is None or ini[0] is None or now - DBConnector.__ini_checked < DBConnector.CONFIG_CHECK_INTERVAL:
+            return False
+        DBConnector.__ini_checked = now
+        try:
+            return os.stat(ini[0]).st_mtime_ns != ini[1]
+        except OSError:
+            return False  # keep the parameters of a file that disappeared
+
+    # (path, modification time, sections) of the first database.ini with a [postgresql] section, looked for
+    # under Utility/ of the working directory, of its parent (tests run from Tests/) and next to this module
+    @staticmethod
+    def __parse_ini() -> tuple:
+        found = (None, None, {})
+        for path in [os.path.join(os.getcwd(), "Utility", "database.ini"),
+                     os.path.join(os.path.dirname(os.getcwd()), "Utility", "database.ini"),
+                     os.path.join(os.path.dirname(os.path.abspath(__file__)), "database.ini")]:
+            try:
+                modified = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            parser = ConfigParser()
+            parser.read(path)
+            ini = (path, modified, {section: dict(parser.items(section)) for section in parser.sections()})
+            if "postgresql" in ini[2]:
+                return ini
+            if found[0] is None:
+                found = ini
+        return found
@@ -0,0 +1,184 @@
+import logging
+import math
+import re
+import sys
+import threading
+from collections import Counter
+
+# per-query metrics of DBConnector.execute and DBConnector.execute_prepared.
+# nothing is measured while no sink is installed, DBConnector only checks that sinks is empty:
+#     histogram = Metrics.HistogramSink()
+#     Metrics.add_sink(histogram)
+#     ... Solution.py calls ...
+#     print(histogram.format_report())
+# a sink is any object with a record(event) method
+
+# the installed sinks, replaced (never mutated) by add_sink and remove_sink
+sinks = ()
+_sinks_lock = threading.Lock()
+
+_SOLUTION_MODULE = "Solution"
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+# one executed statement
+class QueryEvent:
+    __slots__ = ("operation", "query", "seconds", "rows", "wait_seconds", "error", "retries")
+
+    # operation - the Solution.py function that ran the statement
+    # query - the prepared statement's name, or the query text with its literals replaced by ?
+    # seconds - wall time of the statement, including fetching its result
+    # rows - rows returned or affected
+    # wait_seconds - time spent checking the connection out of the pool, reported with its first statement
+    # error - class name of the exception the statement raised, None if it succeeded
+    # retries - times the statement was retried after a serialization failure or deadlock
+    def __init__(self, operation: str, query: str, seconds: float, rows: int, wait_seconds: float, error: str,
+                 retries: int = 0):
+        self.operation = operation
+        self.query = query
+        self.seconds = seconds
+        self.rows = rows
+        self.wait_seconds = wait_seconds
+        self.error = error
+        self.retries = retries
+
+    def __str__(self):
+        return " ".join(name + "=" + str(getattr(self, name)) for name in QueryEvent.__slots__)
+
+
+def add_sink(sink):
+    global sinks
+    with _sinks_lock:
+        sinks = sinks + (sink,)
+    return sink
+
+
+def remove_sink(sink):
+    global sinks
+    with _sinks_lock:
+        sinks = tuple(installed for installed in sinks if installed is not sink)
+
+
+def clear_sinks():
+    global sinks
+    with _sinks_lock:
+        sinks = ()
+
+
+# the query as reported: prepared statements by name, other queries by their text without literals
+def query_shape(query: str) -> str:
+    return _SPACES.sub(" ", _LITERALS.sub("?", query)).strip()[:200]
+
+
+# name of the innermost public Solution.py function on the stack
+def current_operation() -> str:
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_globals.get("__name__") == _SOLUTION_MODULE and not frame.f_code.co_name.startswith("_"):
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "<unknown>"
+
+
+# hands the event to every sink, a failing sink is reported and skipped
+def emit(query: str, seconds: float, rows: int, wait_seconds: float, error: str, retries: int = 0):
+    event = QueryEvent(current_operation(), query, seconds, rows, wait_seconds, error, retries)
+    for sink in sinks:
+        try:
+            sink.record(event)
+        except Exception as e:
+            print(e)
+
+
+# in-memory histogram of statement times per Solution.py function (or per query with key="query").
+# times are counted in logarithmic buckets, resolution of them per doubling, so memory stays constant
+# and percentiles are within about 100 / resolution percent of the exact value
+class HistogramSink:
+    def __init__(self, key: str = "operation", resolution: int = 32):
+        self.key = key
+        self.resolution = resolution
+        self.__lock = threading.Lock()
+        self.__stats = {}  # key -> _Stats
+
+    def record(self, event: QueryEvent):
+        bucket = math.floor(math.log2(max(event.seconds, 1e-9)) * self.resolution)
+        with self.__lock:
+            stats = self.__stats.get(getattr(event, self.key))
+            if stats is None:
+                stats = self.__stats[getattr(event, self.key)] = _Stats()
+            stats.buckets[bucket] += 1
+            stats.count += 1
+            stats.seconds += event.seconds
+            stats.wait_seconds += event.wait_seconds
+            stats.rows += event.rows
+            stats.retries += event.retries
+            if event.error is not None:
+                stats.errors[event.error] += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__stats.clear()
+
+    # key -> {count, errors, retries, rows, total, mean, wait, p50, p95, p99}, times in seconds
+    def report(self) -> dict:
+        with self.__lock:
+            return {key: self.__summary(stats) for key, stats in sorted(self.__stats.items())}
+
+    # the report as a table, times in milliseconds
+    def format_report(self) -> str:
+        lines = ["%-32s %8s %7s %7s %10s %10s %10s %10s %10s" % (self.key, "count", "errors", "retries", "mean", "p50",
+                                                                "p95", "p99", "wait")]
+        for key, summary in self.report().items():
+            lines.append("%-32s %8d %7d %7d %10.3f %10.3f %10.3f %10.3f %10.3f" % (
+                key, summary["count"], sum(summary["errors"].values()), summary["retries"], summary["mean"] * 1e3,
+                summary["p50"] * 1e3, summary["p95"] * 1e3, summary["p99"] * 1e3, summary["wait"] * 1e3))
+        return "\n".join(lines)
+
+    def __summary(self, stats: '_Stats') -> dict:
+        return {"count": stats.count, "errors": dict(stats.errors), "retries": stats.retries, "rows": stats.rows,
+                "total": stats.seconds, "mean": stats.seconds / stats.count, "wait": stats.wait_seconds,
+                "p50": self.__percentile(stats, 0.50), "p95": self.__percentile(stats, 0.95),
+                "p99": self.__percentile(stats, 0.99)}
+
+    # geometric middle of the bucket holding the q-quantile
+    def __percentile(self, stats: '_Stats', q: float) -> float:
+        rank = max(1, math.ceil(q * stats.count))
+        seen = 0
+        for bucket in sorted(stats.buckets):
+            seen += stats.buckets[bucket]
+            if seen >= rank:
+                return 2 ** ((bucket + 0.5) / self.resolution)
+        return 0.0
+
+
+class _Stats:
+    __slots__ = ("buckets", "count", "seconds", "wait_seconds", "rows", "retries", "errors")
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.seconds = 0.0
+        self.wait_seconds = 0.0
+        self.rows = 0
+        self.retries = 0
+        self.errors = Counter()
+
+
+# logs every event as one key=value line
+class LogSink:
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger("DBConnector")
+        self.level = level
+
+    def record(self, event: QueryEvent):
+        self.logger.log(self.level, "%s", event)
+
+
+# calls callback(event) for every event
+class CallbackSink:
+    def __init__(self, callback):
+        self.callback = callback
+
+    def record(self, event: QueryEvent):
+        self.callback(event)
@@ -0,0 +1,209 @@
+import threading
+from typing import List, Tuple
+
+import Utility.DBConnector as Connector
+
+try:
+    import numpy
+    from scipy import sparse
+except ImportError:
+    numpy = None
+    sparse = None
+
+
+# in-process version of get_apartment_recommendation.
+# the Reviewed table is held as a sparse customer x apartment rating matrix, and the rating ratios and
+# approximations of the SQL query are computed for one customer with vectorized numpy operations.
+# the matrix is stored as coordinate arrays that writes update in place, the compressed (CSR/CSC) copies the
+# scoring reads are rebuilt from them on the first query after a write.
+# the engine only sees the writes made through this process, see Solution.enable_recommendation_engine()
+class RecommendationEngine:
+    # constructor, needs numpy and scipy
+    def __init__(self):
+        if numpy is None:
+            raise ImportError("RecommendationEngine needs numpy and scipy")
+        self.__lock = threading.Lock()
+        self.__ratings = _Ratings()
+        self.__stale = False
+
+    # forget every rating
+    def clear(self):
+        with self.__lock:
+            self.__ratings = _Ratings()
+            self.__stale = False
+
+    # (re)load every review from the database, on conn if given (it must not be in the middle of a stream)
+    def load(self, conn: Connector.DBConnector = None):
+        with self.__lock:
+            self.__load(conn)
+
+    # the database changed in a way the engine did not see, reload before the next recommendation
+    def invalidate(self):
+        with self.__lock:
+            self.__stale = True
+
+    # a review was added or updated
+    def set_rating(self, customer_id: int, apartment_id: int, rating: int):
+        with self.__lock:
+            self.__ratings.set(customer_id, apartment_id, rating)
+
+    # the customer was deleted, and with it their reviews
+    def remove_customer(self, customer_id: int):
+        with self.__lock:
+            self.__ratings.remove_customer(customer_id)
+
+    # the apartment was deleted, and with it its reviews
+    def remove_apartment(self, apartment_id: int):
+        with self.__lock:
+            self.__ratings.remove_apartment(apartment_id)
+
+    # the (apartment id, approximated rating) pairs get_apartment_recommendation returns, ordered by apartment id.
+    # a stale engine reloads first, on conn if given and on a connection of its own otherwise
+    def approximations(self, customer_id: int, conn: Connector.DBConnector = None) -> List[Tuple[int, float]]:
+        # the lock is held from the stale check to the end of the reload, so only one caller reloads, and writes
+        # made meanwhile wait and then go to the reloaded matrix
+        with self.__lock:
+            if self.__stale:
+                self.__load(conn)
+            ratings = self.__ratings
+            row = ratings.customers.get(customer_id)
+            if row is None:
+                return []
+            by_customer, by_apartment = ratings.matrices()
+            # columns are only ever appended, the ids of the columns in the matrices stay put
+            apartment_ids = ratings.apartment_ids
+        start, end = by_customer.indptr[row], by_customer.indptr[row + 1]
+        reviewed, own_ratings = by_customer.indices[start:end], by_customer.data[start:end]
+        if len(reviewed) == 0:
+            return []
+
+        # ratio of the customer to every other customer: the average, over the apartments both reviewed,
+        # of (customer's rating / other's rating)
+        common = by_apartment[:, reviewed]
+        others = common.indices
+        ratios = numpy.repeat(own_ratings, numpy.diff(common.indptr)) / common.data
+        keep = others != row
+        ratio_sum = numpy.bincount(others[keep], weights=ratios[keep], minlength=by_customer.shape[0])
+        ratio_count = numpy.bincount(others[keep], minlength=by_customer.shape[0])
+        related = numpy.flatnonzero(ratio_count)
+        if len(related) == 0:
+            return []
+        ratio = ratio_sum[related] / ratio_count[related]
+
+        # every rating of a related customer, scaled by their ratio and kept between 1 and 10,
+        # averaged per apartment
+        scaled = by_customer[related]
+        approx = numpy.clip(numpy.repeat(ratio, numpy.diff(scaled.indptr)) * scaled.data, 1, 10)
+        approx_sum = numpy.bincount(scaled.indices, weights=approx, minlength=by_customer.shape[1])
+        approx_count = numpy.bincount(scaled.indices, minlength=by_customer.shape[1])
+        approx_count[reviewed] = 0
+        cols = numpy.flatnonzero(approx_count)
+
+        result = [(apartment_ids[col], float(approx_sum[col] / approx_count[col])) for col in cols]
+        result.sort()
+        return result
+
+    # reads every review into a new matrix that replaces the current one when complete. caller holds the lock
+    def __load(self, conn: Connector.DBConnector = None):
+        own = conn is None
+        if own:
+            conn = Connector.DBConnector()
+        try:
+            ratings = _Ratings()
+            for batch in conn.stream("SELECT Customer_ID, ID, rating FROM Reviewed", batches=True):
+                for customer_id, apartment_id, rating in zip(batch["Customer_ID"], batch["ID"], batch["rating"]):
+                    ratings.set(customer_id, apartment_id, rating)
+        finally:
+            if own:
+                conn.close()
+        self.__ratings = ratings
+        self.__stale = False
+
+
+# the rating matrix of a RecommendationEngine, which guards it with its lock
+class _Ratings:
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self):
+        self.customers = {}  # customer id -> row
+        self.apartments = {}  # apartment id -> column
+        self.apartment_ids = []  # column -> apartment id
+        self.__positions = {}  # (row, column) -> position in the coordinate arrays
+        self.__rows = numpy.zeros(_Ratings.INITIAL_CAPACITY, dtype=numpy.int64)
+        self.__cols = numpy.zeros(_Ratings.INITIAL_CAPACITY, dtype=numpy.int64)
+        self.__ratings = numpy.zeros(_Ratings.INITIAL_CAPACITY, dtype=numpy.float64)
+        self.__size = 0
+        self.__removed = 0
+        self.__by_customer = None  # CSR copy, None when a write made it stale
+        self.__by_apartment = None  # CSC copy
+
+    def set(self, customer_id: int, apartment_id: int, rating: int):
+        row = self.customers.setdefault(customer_id, len(self.customers))
+        col = self.apartments.get(apartment_id)
+        if col is None:
+            col = self.apartments[apartment_id] = len(self.apartment_ids)
+            self.apartment_ids.append(apartment_id)
+        position = self.__positions.get((row, col))
+        if position is None:
+            if self.__size == len(self.__ratings):
+                self.__grow()
+            position = self.__positions[(row, col)] = self.__size
+            self.__rows[position], self.__cols[position] = row, col
+            self.__size += 1
+        self.__ratings[position] = rating
+        self.__by_customer = self.__by_apartment = None
+
+    def remove_customer(self, customer_id: int):
+        row = self.customers.get(customer_id)
+        if row is not None:
+            self.__remove(self.__rows[:self.__size] == row)
+
+    def remove_apartment(self, apartment_id: int):
+        col = self.apartments.get(apartment_id)
+        if col is not None:
+            self.__remove(self.__cols[:self.__size] == col)
+
+    # the compressed copies of the matrix, rebuilt if a write made them stale
+    def matrices(self):
+        if self.__by_customer is None:
+            shape = (len(self.customers), len(self.apartment_ids))
+            matrix = sparse.coo_matrix((self.__ratings[:self.__size],
+                                        (self.__rows[:self.__size], self.__cols[:self.__size])), shape=shape)
+            self.__by_customer = matrix.tocsr()
+            self.__by_customer.eliminate_zeros()
+            self.__by_apartment = self.__by_customer.tocsc()
+        return self.__by_customer, self.__by_apartment
+
+    # drops the entries selected by mask (over the used part of the arrays)
+    def __remove(self, mask):
+        positions = numpy.flatnonzero(mask & (self.__ratings[:self.__size] != 0))
+        for position in positions:
+            del self.__positions[(int(self.__rows[position]), int(self.__cols[position]))]
+        # a zero rating is an empty cell, the compressed copies drop it
+        self.__ratings[positions] = 0
+        self.__removed += len(positions)
+        if self.__removed > self.__size // 2:
+            self.__compact()
+        self.__by_customer = self.__by_apartment = None
+
+    def __grow(self):
+        self.__rows = _Ratings.__resized(self.__rows, 2 * len(self.__rows))
+        self.__cols = _Ratings.__resized(self.__cols, 2 * len(self.__cols))
+        self.__ratings = _Ratings.__resized(self.__ratings, 2 * len(self.__ratings))
+
+    @staticmethod
+    def __resized(array, capacity: int):
+        resized = numpy.zeros(capacity, dtype=array.dtype)
+        resized[:len(array)] = array
+        return resized
+
+    # squeezes the removed entries out of the coordinate arrays
+    def __compact(self):
+        keep = numpy.flatnonzero(self.__ratings[:self.__size] != 0)
+        self.__size = len(keep)
+        self.__rows[:self.__size] = self.__rows[keep]
+        self.__cols[:self.__size] = self.__cols[keep]
+        self.__ratings[:self.__size] = self.__ratings[keep]
+        self.__removed = 0
+        self.__positions = {(int(row), int(col)): position for position, (row, col)
+                            in enumerate(zip(self.__rows[:self.__size], self.__cols[:self.__size]))}
@@ -0,0 +1,71 @@
+import random
+import threading
+import time
+
+from Utility.Exceptions import DatabaseException
+
+
+# retry policy for the transient errors of concurrent writers: serialization failures and deadlocks.
+# both mean the server aborted the transaction to settle a race, running it again usually succeeds.
+# DBConnector retries the statements it commits on its own (outside of a transaction() scope) with the process-wide
+# policy, see DBConnector.configure_retry(). a transaction() scope is aborted as a whole, so it can only be retried
+# by whoever opened it:
+#     DBConnector.retry_policy().run(lambda: transfer(conn), on_retry=conn.rollback)
+class RetryPolicy:
+    # constructor
+    # max_retries - attempts after the first one, 0 disables retrying
+    # base_delay - seconds of backoff before the first retry, doubled for every further one up to max_delay.
+    #              the actual sleep is drawn uniformly from [0, backoff] (full jitter), so the writers that
+    #              collided do not collide again on their next attempt
+    # retry_on - the exception classes that are retried
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.005, max_delay: float = 0.5,
+                 retry_on: tuple = (DatabaseException.SERIALIZATION_FAILURE, DatabaseException.DEADLOCK_DETECTED)):
+        if max_retries < 0 or base_delay < 0 or max_delay < base_delay:
+            raise ValueError("invalid retry policy: max_retries=%d, base_delay=%s, max_delay=%s" %
+                             (max_retries, base_delay, max_delay))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = tuple(retry_on)
+        self.__lock = threading.Lock()
+        self.retries = 0  # attempts repeated
+        self.recovered = 0  # calls that succeeded after at least one retry
+        self.exhausted = 0  # calls that still failed after max_retries retries
+
+    # seconds to sleep before retry number attempt (counted from 0)
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    # runs fn() until it returns, retrying the retry_on exceptions. on_retry() runs before every retry,
+    # e.g. to roll back the aborted transaction. returns fn's result and the number of retries it took
+    def run(self, fn, on_retry=None) -> tuple:
+        attempt = 0
+        while True:
+            try:
+                result = fn()
+            except self.retry_on:
+                if attempt >= self.max_retries:
+                    if attempt > 0:
+                        with self.__lock:
+                            self.exhausted += 1
+                    raise
+                if on_retry is not None:
+                    on_retry()
+                time.sleep(self.delay(attempt))
+                attempt += 1
+                with self.__lock:
+                    self.retries += 1
+                continue
+            if attempt > 0:
+                with self.__lock:
+                    self.recovered += 1
+            return result, attempt
+
+    # retry counters since the policy was created or reset
+    def stats(self) -> dict:
+        with self.__lock:
+            return {"retries": self.retries, "recovered": self.recovered, "exhausted": self.exhausted}
+
+    def reset_stats(self):
+        with self.__lock:
+            self.retries = self.recovered = self.exhausted = 0
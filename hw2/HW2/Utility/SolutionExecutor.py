@@ -0,0 +1,63 @@
+import contextvars
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import Solution
+import Utility.DBConnector as Connector
+
+
+# concurrency model of the Solution.py API:
+# - every Solution.py function checks a connection out of the process-wide pool (DBConnector.pool()) for the
+#   length of the call and returns it before it returns, so any number of threads may call them at once.
+#   at most pool().max_size calls use the database at the same time, the others wait in the checkout
+# - a DBConnector (its connection and cursor) belongs to the thread that created it, never share one
+# - a DBConnector.transaction() scope is joined only by DBConnectors created in the thread that opened it,
+#   calls dispatched to other threads run in transactions of their own
+# - read-your-writes stickiness (DBConnector.configure_replicas) follows the Session of the caller: a call
+#   submitted here keeps the session of the thread that submitted it, a plain thread starts a session of its own
+# - the module state of Solution.py (the point lookup cache, the recommendation engine) is guarded by locks
+# - races between writers are settled by the database: of two concurrent bookings of the same nights the
+#   Reserved_no_overlap constraint lets the first to commit through and the other gets BAD_PARAMS
+#
+# SolutionExecutor dispatches Solution.py calls to a thread pool sized like the connection pool
+# (more workers would only wait for a connection):
+#     with SolutionExecutor() as executor:
+#         futures = [executor.submit(Solution.get_apartment, i) for i in ids]
+#         apartments = [future.result() for future in futures]
+# every public Solution.py function is also available by name and returns a Future:
+#         future = executor.customer_made_reservation(customer_id, apartment_id, start_date, end_date, price)
+class SolutionExecutor:
+    # constructor
+    # max_workers - threads running calls, defaults to the connection pool's max_size
+    def __init__(self, max_workers: int = None):
+        if max_workers is None:
+            max_workers = Connector.DBConnector.pool().max_size
+        self.max_workers = max_workers
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solution")
+
+    # runs fn(*args, **kwargs) on a worker, in the caller's read-your-writes session
+    def submit(self, fn, *args, **kwargs) -> Future:
+        Connector.DBConnector.session()
+        return self.__executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    # fn applied to every tuple of arguments taken from iterables, like map(), results in order
+    def map(self, fn, *iterables) -> list:
+        return [future.result() for future in [self.submit(fn, *args) for args in zip(*iterables)]]
+
+    # waits for the running calls when wait is True, calls not started yet are dropped when cancel is True
+    def shutdown(self, wait: bool = True, cancel: bool = False):
+        self.__executor.shutdown(wait=wait, cancel_futures=cancel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        return False
+
+    # executor.name(*args) submits Solution.name(*args)
+    def __getattr__(self, name: str):
+        fn = getattr(Solution, name, None) if not name.startswith("_") else None
+        if not callable(fn):
+            raise AttributeError("Solution has no function " + name)
+        return functools.partial(self.submit, fn)